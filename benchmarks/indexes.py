@@ -0,0 +1,165 @@
+"""Insert throughput and hot-read latency before and after the 0003 index plan.
+
+Builds a scratch database at revision 0002, seeds it, times bulk inserts
+and the attendance/billing/payment reads, then repeats at 0003:
+
+    python -m benchmarks.indexes --url sqlite:////tmp/bench.db --students 2000
+
+The database at --url is wiped; never point it at real data.
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import DateTime, Float, Integer, String, column, create_engine, inspect, select, table
+
+# The tables as they stood at 0002/0003, not as the models define them now.
+Student = table("student", column("id", Integer), column("name", String), column("age", Integer))
+Attendance = table(
+    "attendance", column("id", Integer), column("date", DateTime), column("student_id", Integer), column("status", String)
+)
+Billing = table(
+    "billing", column("id", Integer), column("student_id", Integer), column("amount", Float),
+    column("due_date", DateTime), column("status", String),
+)
+Payment = table(
+    "payment", column("id", Integer), column("bill_id", Integer), column("student_id", Integer),
+    column("payment_date", DateTime), column("amount_paid", Float), column("payment_method", String),
+)
+
+REVISIONS = {"before": "0002", "after": "0003"}
+BATCH_SIZE = 500
+START = datetime(2024, 1, 1, 8, 0)
+STATUSES = ("pending", "paid", "partial", "overdue")
+
+
+def migrate(connection, revision):
+    config = Config("alembic.ini")
+    config.attributes["connection"] = connection
+    command.downgrade(config, "base")
+    command.upgrade(config, revision)
+
+
+def insert_batches(connection, table, rows):
+    start = time.perf_counter()
+    for position in range(0, len(rows), BATCH_SIZE):
+        with connection.begin():
+            connection.execute(table.insert(), rows[position:position + BATCH_SIZE])
+    return len(rows) / (time.perf_counter() - start)
+
+
+def seed(connection, students, days, bills_per_student, rng):
+    throughput = {}
+    throughput["student"] = insert_batches(
+        connection, Student,
+        [{"id": student_id, "name": f"Student {student_id}", "age": rng.randint(2, 6)} for student_id in range(1, students + 1)],
+    )
+    throughput["attendance"] = insert_batches(
+        connection, Attendance,
+        [
+            {"student_id": student_id, "date": START + timedelta(days=day), "status": rng.choice(("present", "absent"))}
+            for day in range(days) for student_id in range(1, students + 1)
+        ],
+    )
+    bills = [
+        {
+            "id": bill_id, "student_id": rng.randint(1, students), "amount": 100.0,
+            "due_date": START + timedelta(days=rng.randint(0, 365)), "status": rng.choice(STATUSES),
+        }
+        for bill_id in range(1, students * bills_per_student + 1)
+    ]
+    throughput["billing"] = insert_batches(connection, Billing, bills)
+    throughput["payment"] = insert_batches(
+        connection, Payment,
+        [
+            {"bill_id": bill["id"], "student_id": bill["student_id"], "amount_paid": 50.0,
+             "payment_method": "bank_transfer", "payment_date": bill["due_date"]}
+            for bill in bills for _ in range(2)
+        ],
+    )
+    return throughput
+
+
+def hot_reads(students, days, bills):
+    # Mirrors the queries the attendance, billing and payment screens run.
+    return {
+        "attendance by student+date": lambda rng: select(Attendance).filter(
+            Attendance.c.student_id == rng.randint(1, students),
+            Attendance.c.date >= START + timedelta(days=days // 2),
+        ).order_by(Attendance.c.date),
+        "bills by student+status+due": lambda rng: select(Billing).filter(
+            Billing.c.student_id == rng.randint(1, students), Billing.c.status == "pending",
+        ).order_by(Billing.c.due_date),
+        "payments by bill": lambda rng: select(Payment).filter(
+            Payment.c.bill_id == rng.randint(1, bills),
+        ).order_by(Payment.c.payment_date),
+    }
+
+
+def time_reads(connection, queries, repeat, rng):
+    latency = {}
+    for label, make_query in queries.items():
+        samples = []
+        for _ in range(repeat):
+            query = make_query(rng)
+            start = time.perf_counter()
+            connection.execute(query).all()
+            samples.append((time.perf_counter() - start) * 1000)
+        samples.sort()
+        latency[label] = (statistics.mean(samples), samples[int(len(samples) * 0.95) - 1])
+    return latency
+
+
+def index_count(connection, tables):
+    inspector = inspect(connection)
+    return sum(len(inspector.get_indexes(table)) for table in tables)
+
+
+def run(url, students, days, bills_per_student, repeat):
+    engine = create_engine(url)
+    results = {}
+    for label, revision in REVISIONS.items():
+        rng = random.Random(42)
+        with engine.connect() as connection:
+            migrate(connection, revision)
+            connection.commit()
+            throughput = seed(connection, students, days, bills_per_student, rng)
+            queries = hot_reads(students, days, students * bills_per_student)
+            latency = time_reads(connection, queries, repeat, rng)
+            indexes = index_count(connection, ("student", "attendance", "billing", "payment"))
+            connection.rollback()
+            migrate(connection, "base")
+            connection.commit()
+        results[label] = (throughput, latency, indexes)
+    engine.dispose()
+    return results
+
+
+def report(results):
+    before, after = results["before"], results["after"]
+    print(f"{'indexes on benchmarked tables':32} {before[2]:>12} {after[2]:>12}")
+    print(f"\n{'insert throughput (rows/s)':32} {'before':>12} {'after':>12} {'change':>8}")
+    for table, rate in before[0].items():
+        print(f"{table:32} {rate:12.0f} {after[0][table]:12.0f} {after[0][table] / rate - 1:+8.0%}")
+    print(f"\n{'read latency (ms, mean / p95)':32} {'before':>12} {'after':>12}")
+    for query, (mean, p95) in before[1].items():
+        new_mean, new_p95 = after[1][query]
+        print(f"{query:32} {mean:5.2f} /{p95:5.2f} {new_mean:5.2f} /{new_p95:5.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="sqlite:///index_benchmark.db")
+    parser.add_argument("--students", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--bills-per-student", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=200)
+    arguments = parser.parse_args()
+    report(run(arguments.url, arguments.students, arguments.days, arguments.bills_per_student, arguments.repeat))
+
+
+if __name__ == "__main__":
+    main()
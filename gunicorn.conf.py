@@ -0,0 +1,29 @@
+# Production server: `gunicorn` from the repository root picks this file up.
+# Run `alembic upgrade head` first; workers refuse to start on an old schema.
+import gc
+from instance.config import BIND, WORKERS, MAX_REQUESTS, MAX_REQUESTS_JITTER
+
+wsgi_app = "preschool_app:create_app()"
+worker_class = "uvicorn.workers.UvicornWorker"
+bind = BIND
+workers = WORKERS
+
+# Import the code and build the app once in the master; workers inherit it
+# through fork instead of each importing FastAPI, SQLAlchemy and the models.
+# Engines are built lazily, so no connection is shared across the fork.
+preload_app = True
+
+# Replace each worker after this many requests (spread by the jitter so
+# they don't all restart at once) to cap slow memory growth.
+max_requests = MAX_REQUESTS
+max_requests_jitter = MAX_REQUESTS_JITTER
+
+graceful_timeout = 30
+
+
+def when_ready(server):
+    # Runs in the master after preload, before any worker is forked. Moving
+    # every object into the permanent generation keeps workers' garbage
+    # collections from touching (and so copying) the shared pages.
+    gc.collect()
+    gc.freeze()
@@ -1,5 +1,47 @@
-from decouple import config
+import os
+from decouple import UndefinedValueError, config
 from dotenv import load_dotenv
 
-SECRET_KEY = config("SECRET_KEY")
-DATABASE_URI = config("DATABASE_URI")
\ No newline at end of file
+# Required, but only checked when Settings are built, so Settings(...) can
+# supply them without the environment.
+SECRET_KEY = config("SECRET_KEY", default="")
+DATABASE_URI = config("DATABASE_URI", default="")
+ASYNC_DATABASE_URI = config("ASYNC_DATABASE_URI", default="")
+REPLICA_DATABASE_URI = config("REPLICA_DATABASE_URI", default="")
+
+POOL_SIZE = config("POOL_SIZE", default=5, cast=int)
+MAX_OVERFLOW = config("MAX_OVERFLOW", default=10, cast=int)
+POOL_TIMEOUT = config("POOL_TIMEOUT", default=30, cast=float)
+POOL_RECYCLE = config("POOL_RECYCLE", default=1800, cast=int)
+POOL_PRE_PING = config("POOL_PRE_PING", default=True, cast=bool)
+
+DEFAULT_PAGE_SIZE = config("DEFAULT_PAGE_SIZE", default=50, cast=int)
+MAX_PAGE_SIZE = config("MAX_PAGE_SIZE", default=200, cast=int)
+
+AUTOCOMPLETE_MAX_ENTRIES = config("AUTOCOMPLETE_MAX_ENTRIES", default=200000, cast=int)
+AUTOCOMPLETE_REFRESH_SECONDS = config("AUTOCOMPLETE_REFRESH_SECONDS", default=300, cast=int)
+
+LIVE_QUEUE_SIZE = config("LIVE_QUEUE_SIZE", default=100, cast=int)
+LIVE_SNAPSHOT_SECONDS = config("LIVE_SNAPSHOT_SECONDS", default=10, cast=int)
+OCCUPANCY_REFRESH_SECONDS = config("OCCUPANCY_REFRESH_SECONDS", default=60, cast=int)
+
+BIND = config("BIND", default="0.0.0.0:8000")
+WORKERS = config("WORKERS", default=os.cpu_count() or 1, cast=int)
+MAX_REQUESTS = config("MAX_REQUESTS", default=5000, cast=int)
+MAX_REQUESTS_JITTER = config("MAX_REQUESTS_JITTER", default=500, cast=int)
+
+
+class Settings:
+    # The values above, with any of them replaced for one app:
+    # create_app(Settings(SECRET_KEY="test", DATABASE_URI="sqlite:///test.db")).
+    def __init__(self, **overrides):
+        for name, value in globals().items():
+            if name.isupper():
+                setattr(self, name, value)
+        for name, value in overrides.items():
+            if not hasattr(self, name):
+                raise TypeError(f"Unknown setting: {name}")
+            setattr(self, name, value)
+        missing = [name for name in ("SECRET_KEY", "DATABASE_URI") if not getattr(self, name)]
+        if missing:
+            raise UndefinedValueError(f"{', '.join(missing)} not set: add to the environment or pass to Settings()")
\ No newline at end of file
@@ -0,0 +1,62 @@
+from logging.config import fileConfig
+from alembic import context
+from sqlalchemy import create_engine, pool
+from instance.config import Settings
+from preschool_app.models import Base
+from preschool_app.search import SEARCHABLE
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+FULL_TEXT_TABLES = tuple(f"{table}_fts" for table in SEARCHABLE.values())
+
+
+def include_name(name, type_, parent_names):
+    # FTS5 tables and their shadow tables are managed by search.py, not the models.
+    return not (type_ == "table" and name.startswith(FULL_TEXT_TABLES))
+
+
+def run_migrations_offline():
+    context.configure(
+        url=Settings().DATABASE_URI,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=True,
+        include_name=include_name,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_on(connection):
+    # Batch mode lets ALTERs run on SQLite by copying the table.
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        render_as_batch=True,
+        include_name=include_name,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    # Scripts such as benchmarks/indexes.py pass their own connection in.
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        run_migrations_on(connection)
+        return
+    connectable = create_engine(Settings().DATABASE_URI, poolclass=pool.NullPool)
+    with connectable.connect() as connection:
+        run_migrations_on(connection)
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
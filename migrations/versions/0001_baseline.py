@@ -0,0 +1,338 @@
+"""baseline: schema previously built by Base.metadata.create_all
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-18 07:56:25.089795
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('department',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=200), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('department', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_department_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_department_name'), ['name'], unique=False)
+
+    op.create_table('emergency',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=200), nullable=True),
+    sa.Column('phone', sa.String(length=80), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('emergency', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_emergency_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_emergency_name'), ['name'], unique=False)
+        batch_op.create_index(batch_op.f('ix_emergency_phone'), ['phone'], unique=False)
+
+    op.create_table('gender',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=200), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('gender', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_gender_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_gender_name'), ['name'], unique=False)
+
+    op.create_table('medical_category',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=200), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('medical_category', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_medical_category_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_medical_category_name'), ['name'], unique=False)
+
+    op.create_table('program',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=200), nullable=True),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('program', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_program_description'), ['description'], unique=False, mysql_length=255)
+        batch_op.create_index(batch_op.f('ix_program_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_program_name'), ['name'], unique=False)
+
+    op.create_table('role',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=200), nullable=True),
+    sa.Column('staff_id', sa.Integer(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('role', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_role_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_role_name'), ['name'], unique=False)
+
+    op.create_table('staff',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=200), nullable=True),
+    sa.Column('age', sa.Integer(), nullable=True),
+    sa.Column('gender_id', sa.Integer(), nullable=True),
+    sa.Column('address', sa.Text(), nullable=True),
+    sa.Column('email', sa.String(length=120), nullable=True),
+    sa.Column('phone', sa.String(length=80), nullable=True),
+    sa.Column('password', sa.String(length=100), nullable=True),
+    sa.Column('hashedpassword', sa.String(length=100), nullable=True),
+    sa.Column('department_id', sa.Integer(), nullable=True),
+    sa.Column('role_id', sa.Integer(), nullable=True),
+    sa.Column('image', sa.String(length=120), nullable=True),
+    sa.CheckConstraint('age >= 15'),
+    sa.ForeignKeyConstraint(['department_id'], ['department.id'], ),
+    sa.ForeignKeyConstraint(['gender_id'], ['gender.id'], ),
+    sa.ForeignKeyConstraint(['role_id'], ['role.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('staff', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_staff_address'), ['address'], unique=False, mysql_length=255)
+        batch_op.create_index(batch_op.f('ix_staff_age'), ['age'], unique=False)
+        batch_op.create_index(batch_op.f('ix_staff_email'), ['email'], unique=True)
+        batch_op.create_index(batch_op.f('ix_staff_hashedpassword'), ['hashedpassword'], unique=False)
+        batch_op.create_index(batch_op.f('ix_staff_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_staff_image'), ['image'], unique=False)
+        batch_op.create_index(batch_op.f('ix_staff_name'), ['name'], unique=False)
+        batch_op.create_index(batch_op.f('ix_staff_password'), ['password'], unique=False)
+        batch_op.create_index(batch_op.f('ix_staff_phone'), ['phone'], unique=False)
+
+    # role and staff reference each other, so role's key is added once staff exists.
+    with op.batch_alter_table('role', schema=None) as batch_op:
+        batch_op.create_foreign_key('fk_role_staff_id_staff', 'staff', ['staff_id'], ['id'])
+
+    op.create_table('medical',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=200), nullable=True),
+    sa.Column('medical_category_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['medical_category_id'], ['medical_category.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('medical', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_medical_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_medical_name'), ['name'], unique=False)
+
+    op.create_table('parent',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=200), nullable=True),
+    sa.Column('age', sa.Integer(), nullable=True),
+    sa.Column('gender_id', sa.Integer(), nullable=True),
+    sa.Column('address', sa.Text(), nullable=True),
+    sa.Column('email', sa.String(length=120), nullable=True),
+    sa.Column('phone', sa.String(length=80), nullable=True),
+    sa.Column('password', sa.String(length=100), nullable=True),
+    sa.Column('hashedpassword', sa.String(length=100), nullable=True),
+    sa.CheckConstraint('age >= 15'),
+    sa.ForeignKeyConstraint(['gender_id'], ['gender.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('parent', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_parent_age'), ['age'], unique=False)
+        batch_op.create_index(batch_op.f('ix_parent_email'), ['email'], unique=True)
+        batch_op.create_index(batch_op.f('ix_parent_hashedpassword'), ['hashedpassword'], unique=False)
+        batch_op.create_index(batch_op.f('ix_parent_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_parent_name'), ['name'], unique=False)
+        batch_op.create_index(batch_op.f('ix_parent_password'), ['password'], unique=False)
+        batch_op.create_index(batch_op.f('ix_parent_phone'), ['phone'], unique=False)
+
+    op.create_table('schedule',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('staff_id', sa.Integer(), nullable=True),
+    sa.Column('day_of_week', sa.String(length=20), nullable=True),
+    sa.Column('start_time', sa.DateTime(), nullable=True),
+    sa.Column('end_time', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['staff_id'], ['staff.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('schedule', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_schedule_day_of_week'), ['day_of_week'], unique=False)
+        batch_op.create_index(batch_op.f('ix_schedule_id'), ['id'], unique=False)
+
+    op.create_table('teacher',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('staff_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['staff_id'], ['staff.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('teacher', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_teacher_id'), ['id'], unique=False)
+
+    op.create_table('class',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=200), nullable=True),
+    sa.Column('program_id', sa.Integer(), nullable=True),
+    sa.Column('class_teacher_id', sa.Integer(), nullable=True),
+    sa.Column('assistant_teacher_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['assistant_teacher_id'], ['teacher.id'], ),
+    sa.ForeignKeyConstraint(['class_teacher_id'], ['teacher.id'], ),
+    sa.ForeignKeyConstraint(['program_id'], ['program.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('class', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_class_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_class_name'), ['name'], unique=False)
+
+    op.create_table('staff_medical_condition_association',
+    sa.Column('staff_id', sa.Integer(), nullable=False),
+    sa.Column('medical_condition_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['medical_condition_id'], ['medical.id'], ),
+    sa.ForeignKeyConstraint(['staff_id'], ['staff.id'], ),
+    sa.PrimaryKeyConstraint('staff_id', 'medical_condition_id')
+    )
+    op.create_table('student',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=200), nullable=True),
+    sa.Column('age', sa.Integer(), nullable=True),
+    sa.Column('address', sa.Text(), nullable=True),
+    sa.Column('gender_id', sa.Integer(), nullable=True),
+    sa.Column('class_id', sa.Integer(), nullable=True),
+    sa.Column('emergency_contact_id', sa.Integer(), nullable=True),
+    sa.Column('medical_condition_id', sa.Integer(), nullable=True),
+    sa.Column('is_disable', sa.Boolean(), nullable=True),
+    sa.Column('image', sa.String(length=120), nullable=True),
+    sa.CheckConstraint('age <= 10'),
+    sa.ForeignKeyConstraint(['class_id'], ['class.id'], ),
+    sa.ForeignKeyConstraint(['emergency_contact_id'], ['emergency.id'], ),
+    sa.ForeignKeyConstraint(['gender_id'], ['gender.id'], ),
+    sa.ForeignKeyConstraint(['medical_condition_id'], ['medical.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('student', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_student_address'), ['address'], unique=False, mysql_length=255)
+        batch_op.create_index(batch_op.f('ix_student_age'), ['age'], unique=False)
+        batch_op.create_index(batch_op.f('ix_student_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_student_image'), ['image'], unique=False)
+        batch_op.create_index(batch_op.f('ix_student_is_disable'), ['is_disable'], unique=False)
+        batch_op.create_index(batch_op.f('ix_student_name'), ['name'], unique=False)
+
+    op.create_table('teacher_class_association',
+    sa.Column('teacher_id', sa.Integer(), nullable=False),
+    sa.Column('class_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['class_id'], ['class.id'], ),
+    sa.ForeignKeyConstraint(['teacher_id'], ['teacher.id'], ),
+    sa.PrimaryKeyConstraint('teacher_id', 'class_id')
+    )
+    op.create_table('admission',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('student_id', sa.Integer(), nullable=True),
+    sa.Column('program_id', sa.Integer(), nullable=True),
+    sa.Column('student_number', sa.String(length=20), nullable=True),
+    sa.Column('date', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['program_id'], ['program.id'], ),
+    sa.ForeignKeyConstraint(['student_id'], ['student.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('admission', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_admission_date'), ['date'], unique=False)
+        batch_op.create_index(batch_op.f('ix_admission_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_admission_student_number'), ['student_number'], unique=False)
+
+    op.create_table('attendance',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('date', sa.DateTime(), nullable=True),
+    sa.Column('student_id', sa.Integer(), nullable=True),
+    sa.Column('status', sa.String(length=10), nullable=True),
+    sa.ForeignKeyConstraint(['student_id'], ['student.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('attendance', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_attendance_date'), ['date'], unique=False)
+        batch_op.create_index(batch_op.f('ix_attendance_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_attendance_status'), ['status'], unique=False)
+
+    op.create_table('billing',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('student_id', sa.Integer(), nullable=True),
+    sa.Column('amount', sa.Float(), nullable=True),
+    sa.Column('due_date', sa.DateTime(), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.ForeignKeyConstraint(['student_id'], ['student.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('billing', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_billing_amount'), ['amount'], unique=False)
+        batch_op.create_index(batch_op.f('ix_billing_due_date'), ['due_date'], unique=False)
+        batch_op.create_index(batch_op.f('ix_billing_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_billing_status'), ['status'], unique=False)
+
+    op.create_table('class_student_association',
+    sa.Column('class_id', sa.Integer(), nullable=False),
+    sa.Column('student_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['class_id'], ['class.id'], ),
+    sa.ForeignKeyConstraint(['student_id'], ['student.id'], ),
+    sa.PrimaryKeyConstraint('class_id', 'student_id')
+    )
+    op.create_table('daily_activity',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('date', sa.DateTime(), nullable=True),
+    sa.Column('description', sa.String(length=200), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('student_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['student_id'], ['student.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('daily_activity', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_daily_activity_date'), ['date'], unique=False)
+        batch_op.create_index(batch_op.f('ix_daily_activity_description'), ['description'], unique=False)
+        batch_op.create_index(batch_op.f('ix_daily_activity_id'), ['id'], unique=False)
+
+    op.create_table('student_medical_condition_association',
+    sa.Column('student_id', sa.Integer(), nullable=False),
+    sa.Column('medical_condition_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['medical_condition_id'], ['medical.id'], ),
+    sa.ForeignKeyConstraint(['student_id'], ['student.id'], ),
+    sa.PrimaryKeyConstraint('student_id', 'medical_condition_id')
+    )
+    op.create_table('payment',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('bill_id', sa.Integer(), nullable=True),
+    sa.Column('payment_date', sa.DateTime(), nullable=True),
+    sa.Column('amount_paid', sa.Float(), nullable=True),
+    sa.Column('payment_method', sa.String(length=20), nullable=True),
+    sa.Column('student_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['bill_id'], ['billing.id'], ),
+    sa.ForeignKeyConstraint(['student_id'], ['student.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('payment', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_payment_amount_paid'), ['amount_paid'], unique=False)
+        batch_op.create_index(batch_op.f('ix_payment_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_payment_payment_date'), ['payment_date'], unique=False)
+        batch_op.create_index(batch_op.f('ix_payment_payment_method'), ['payment_method'], unique=False)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        op.drop_constraint('fk_role_staff_id_staff', 'role', type_='foreignkey')
+    op.drop_table('payment')
+    op.drop_table('student_medical_condition_association')
+    op.drop_table('daily_activity')
+    op.drop_table('class_student_association')
+    op.drop_table('billing')
+    op.drop_table('attendance')
+    op.drop_table('admission')
+    op.drop_table('teacher_class_association')
+    op.drop_table('student')
+    op.drop_table('staff_medical_condition_association')
+    op.drop_table('class')
+    op.drop_table('teacher')
+    op.drop_table('schedule')
+    op.drop_table('parent')
+    op.drop_table('medical')
+    op.drop_table('staff')
+    op.drop_table('role')
+    op.drop_table('program')
+    op.drop_table('medical_category')
+    op.drop_table('gender')
+    op.drop_table('emergency')
+    op.drop_table('department')
@@ -0,0 +1,38 @@
+"""student search indexes: composites for /students/search and the reverse medical-condition lookup
+
+Revision ID: 0001a
+Revises: 0001
+Create Date: 2026-10-18 08:47:12.310554
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001a'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('student', schema=None) as batch_op:
+        batch_op.create_index('ix_student_class_id_age', ['class_id', 'age'], unique=False)
+        batch_op.create_index('ix_student_gender_id_age', ['gender_id', 'age'], unique=False)
+        batch_op.create_index('ix_student_is_disable_age', ['is_disable', 'age'], unique=False)
+
+    with op.batch_alter_table('student_medical_condition_association', schema=None) as batch_op:
+        batch_op.create_index('ix_student_medical_condition_reverse', ['medical_condition_id', 'student_id'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('student_medical_condition_association', schema=None) as batch_op:
+        batch_op.drop_index('ix_student_medical_condition_reverse')
+
+    with op.batch_alter_table('student', schema=None) as batch_op:
+        batch_op.drop_index('ix_student_is_disable_age')
+        batch_op.drop_index('ix_student_gender_id_age')
+        batch_op.drop_index('ix_student_class_id_age')
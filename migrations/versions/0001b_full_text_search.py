@@ -0,0 +1,59 @@
+"""full-text search: FTS5 tables on SQLite, FULLTEXT indexes on MySQL, over student, parent and staff names
+
+Revision ID: 0001b
+Revises: 0001a
+Create Date: 2026-10-18 08:47:40.882913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001b'
+down_revision: Union[str, None] = '0001a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('student', 'parent', 'staff')
+
+
+def sqlite_ddl(table):
+    # External-content FTS5 table over <table>.name, kept in sync by
+    # triggers; rowid is the row's primary key.
+    fts = f'{table}_fts'
+    return [
+        f"CREATE VIRTUAL TABLE {fts} USING fts5("
+        f"name, content='{table}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, name) VALUES (new.id, new.name); END",
+        f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, name) VALUES ('delete', old.id, old.name); END",
+        f"CREATE TRIGGER {fts}_au AFTER UPDATE OF name ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, name) VALUES ('delete', old.id, old.name); "
+        f"INSERT INTO {fts}(rowid, name) VALUES (new.id, new.name); END",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    for table in TABLES:
+        if dialect == 'sqlite':
+            for statement in sqlite_ddl(table):
+                op.execute(statement)
+        elif dialect == 'mysql':
+            # InnoDB keeps FULLTEXT indexes current on every write.
+            op.execute(f'ALTER TABLE {table} ADD FULLTEXT INDEX ft_{table}_name (name)')
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    for table in TABLES:
+        if dialect == 'sqlite':
+            for trigger in ('ai', 'ad', 'au'):
+                op.execute(f'DROP TRIGGER IF EXISTS {table}_fts_{trigger}')
+            op.execute(f'DROP TABLE IF EXISTS {table}_fts')
+        elif dialect == 'mysql':
+            op.execute(f'ALTER TABLE {table} DROP INDEX ft_{table}_name')
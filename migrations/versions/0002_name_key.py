@@ -0,0 +1,57 @@
+"""name_key: normalized unique name on lookup tables
+
+Revision ID: 0002
+Revises: 0001b
+Create Date: 2026-10-18 07:57:36.966681
+
+"""
+import unicodedata
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('program', 'class', 'gender', 'department', 'role')
+
+
+def normalize_name(name):
+    # The key as the models computed it when this revision was written.
+    return " ".join(unicodedata.normalize("NFKC", name or "").casefold().split())
+
+
+def backfill(table):
+    # The oldest row keeps the plain key; rows that only differed by case or
+    # spacing get "#<id>" appended so the unique index can be built. Rename
+    # them afterwards to collapse the duplicates.
+    connection = op.get_bind()
+    rows = sa.table(table, sa.column('id', sa.Integer), sa.column('name', sa.String), sa.column('name_key', sa.String))
+    taken = set()
+    for row_id, name in connection.execute(sa.select(rows.c.id, rows.c.name).order_by(rows.c.id)):
+        key = normalize_name(name)
+        if key in taken:
+            key = f"{key}#{row_id}"
+        taken.add(key)
+        connection.execute(rows.update().where(rows.c.id == row_id).values(name_key=key))
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('name_key', sa.String(length=200), nullable=True))
+        backfill(table)
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.alter_column('name_key', existing_type=sa.String(length=200), nullable=False)
+            batch_op.create_index(batch_op.f(f'ix_{table}_name_key'), ['name_key'], unique=True)
+
+
+def downgrade() -> None:
+    for table in reversed(TABLES):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_index(batch_op.f(f'ix_{table}_name_key'))
+            batch_op.drop_column('name_key')
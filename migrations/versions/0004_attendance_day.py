@@ -0,0 +1,62 @@
+"""attendance day: one attendance row per student per day
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 08:40:12.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+attendance = sa.table(
+    'attendance',
+    sa.column('id', sa.Integer),
+    sa.column('date', sa.DateTime),
+    sa.column('attendance_day', sa.Date),
+    sa.column('student_id', sa.Integer),
+)
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('attendance', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('attendance_day', sa.Date(), nullable=True))
+
+    op.execute(attendance.update().values(
+        attendance_day=sa.func.coalesce(sa.func.date(attendance.c.date), sa.func.current_date())
+    ))
+
+    # Keep the last row marked for each student and day. The derived table
+    # lets MySQL read the table it is deleting from.
+    latest = (
+        sa.select(sa.func.max(attendance.c.id).label('id'))
+        .group_by(attendance.c.student_id, attendance.c.attendance_day)
+        .subquery('latest')
+    )
+    op.execute(attendance.delete().where(attendance.c.id.not_in(sa.select(latest.c.id))))
+
+    # The unique index is created before the old composite is dropped so
+    # MySQL always has an index for the student_id foreign key.
+    with op.batch_alter_table('attendance', schema=None) as batch_op:
+        batch_op.alter_column('attendance_day', existing_type=sa.Date(), nullable=False)
+        batch_op.create_index('ix_attendance_student_id_attendance_day', ['student_id', 'attendance_day'], unique=True)
+        batch_op.create_index('ix_attendance_attendance_day_status', ['attendance_day', 'status'], unique=False)
+        batch_op.drop_index('ix_attendance_student_id_date')
+        batch_op.drop_index('ix_attendance_date')
+
+
+def downgrade() -> None:
+    # Collapsed duplicates are not restored.
+    with op.batch_alter_table('attendance', schema=None) as batch_op:
+        batch_op.create_index('ix_attendance_date', ['date'], unique=False)
+        batch_op.create_index('ix_attendance_student_id_date', ['student_id', 'date'], unique=False)
+        batch_op.drop_index('ix_attendance_attendance_day_status')
+        batch_op.drop_index('ix_attendance_student_id_attendance_day')
+        batch_op.drop_column('attendance_day')
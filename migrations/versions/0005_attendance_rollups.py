@@ -0,0 +1,99 @@
+"""attendance rollups: per-student monthly and per-class daily counts
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 08:08:34.683446
+
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+attendance = sa.table(
+    'attendance',
+    sa.column('student_id', sa.Integer),
+    sa.column('attendance_day', sa.Date),
+    sa.column('status', sa.String),
+)
+student = sa.table(
+    'student',
+    sa.column('id', sa.Integer),
+    sa.column('class_id', sa.Integer),
+)
+class_attendance_day = sa.table(
+    'class_attendance_day',
+    sa.column('class_id', sa.Integer),
+    sa.column('attendance_day', sa.Date),
+    sa.column('present', sa.Integer),
+    sa.column('absent', sa.Integer),
+)
+student_attendance_month = sa.table(
+    'student_attendance_month',
+    sa.column('student_id', sa.Integer),
+    sa.column('month', sa.Date),
+    sa.column('present', sa.Integer),
+    sa.column('absent', sa.Integer),
+)
+
+
+def status_counts():
+    return (
+        sa.func.sum(sa.case((attendance.c.status == 'present', 1), else_=0)),
+        sa.func.sum(sa.case((attendance.c.status == 'absent', 1), else_=0)),
+    )
+
+
+def next_month(day):
+    return date(day.year + day.month // 12, day.month % 12 + 1, 1)
+
+
+def upgrade() -> None:
+    op.create_table('class_attendance_day',
+    sa.Column('class_id', sa.Integer(), nullable=False),
+    sa.Column('attendance_day', sa.Date(), nullable=False),
+    sa.Column('present', sa.Integer(), nullable=False),
+    sa.Column('absent', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['class_id'], ['class.id'], ),
+    sa.PrimaryKeyConstraint('class_id', 'attendance_day')
+    )
+    op.create_table('student_attendance_month',
+    sa.Column('student_id', sa.Integer(), nullable=False),
+    sa.Column('month', sa.Date(), nullable=False),
+    sa.Column('present', sa.Integer(), nullable=False),
+    sa.Column('absent', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['student_id'], ['student.id'], ),
+    sa.PrimaryKeyConstraint('student_id', 'month')
+    )
+
+    # Backfill from existing attendance: the class rollups in one statement,
+    # the student rollups in one per month, since truncating a date to its
+    # month differs between dialects.
+    op.execute(class_attendance_day.insert().from_select(
+        ['class_id', 'attendance_day', 'present', 'absent'],
+        sa.select(student.c.class_id, attendance.c.attendance_day, *status_counts())
+        .join(student, student.c.id == attendance.c.student_id)
+        .where(student.c.class_id.isnot(None))
+        .group_by(student.c.class_id, attendance.c.attendance_day),
+    ))
+    days = op.get_bind().execute(sa.select(attendance.c.attendance_day).distinct()).scalars().all()
+    for month in sorted({day.replace(day=1) for day in days}):
+        op.execute(student_attendance_month.insert().from_select(
+            ['student_id', 'month', 'present', 'absent'],
+            sa.select(attendance.c.student_id, sa.literal(month, sa.Date), *status_counts())
+            .where(attendance.c.attendance_day >= month, attendance.c.attendance_day < next_month(month))
+            .group_by(attendance.c.student_id),
+        ))
+
+
+def downgrade() -> None:
+    op.drop_table('student_attendance_month')
+    op.drop_table('class_attendance_day')
@@ -0,0 +1,54 @@
+"""enrollment counts: maintained school and per-class student counters
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 08:10:07.475781
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+student = sa.table(
+    'student',
+    sa.column('id', sa.Integer),
+    sa.column('class_id', sa.Integer),
+)
+enrollment_count = sa.table(
+    'enrollment_count',
+    sa.column('scope', sa.String),
+    sa.column('scope_id', sa.Integer),
+    sa.column('students', sa.Integer),
+)
+
+
+def upgrade() -> None:
+    op.create_table('enrollment_count',
+    sa.Column('scope', sa.String(length=20), nullable=False),
+    sa.Column('scope_id', sa.Integer(), nullable=False),
+    sa.Column('students', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('scope', 'scope_id')
+    )
+    # Count existing students: one school row, one row per class.
+    columns = ['scope', 'scope_id', 'students']
+    op.execute(enrollment_count.insert().from_select(
+        columns, sa.select(sa.literal('school'), sa.literal(0), sa.func.count(student.c.id))
+    ))
+    op.execute(enrollment_count.insert().from_select(
+        columns,
+        sa.select(sa.literal('class'), student.c.class_id, sa.func.count(student.c.id))
+        .where(student.c.class_id.isnot(None))
+        .group_by(student.c.class_id),
+    ))
+
+
+def downgrade() -> None:
+    op.drop_table('enrollment_count')
@@ -0,0 +1,68 @@
+"""attendance bitmaps: one present/absent bitset per student per month
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 08:14:11.480226
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+attendance = sa.table(
+    'attendance',
+    sa.column('student_id', sa.Integer),
+    sa.column('attendance_day', sa.Date),
+    sa.column('status', sa.String),
+)
+bitmap = sa.table(
+    'attendance_bitmap',
+    sa.column('student_id', sa.Integer),
+    sa.column('month', sa.Date),
+    sa.column('present_days', sa.Integer),
+    sa.column('absent_days', sa.Integer),
+)
+
+
+def upgrade() -> None:
+    op.create_table('attendance_bitmap',
+    sa.Column('student_id', sa.Integer(), nullable=False),
+    sa.Column('month', sa.Date(), nullable=False),
+    sa.Column('present_days', sa.Integer(), nullable=False),
+    sa.Column('absent_days', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['student_id'], ['student.id'], ),
+    sa.PrimaryKeyConstraint('student_id', 'month')
+    )
+    with op.batch_alter_table('attendance_bitmap', schema=None) as batch_op:
+        batch_op.create_index('ix_attendance_bitmap_month', ['month'], unique=False)
+
+    # Backfill: a few bytes per student-month, so the whole history fits in
+    # memory while attendance rows are streamed through. Day d of the month
+    # is bit d - 1.
+    connection = op.get_bind()
+    bitmaps = {}
+    rows = connection.execution_options(yield_per=10000).execute(
+        sa.select(attendance.c.student_id, attendance.c.attendance_day, attendance.c.status)
+    )
+    for student_id, day, status in rows:
+        bits = bitmaps.setdefault((student_id, day.replace(day=1)), {'present_days': 0, 'absent_days': 0})
+        if status in ('present', 'absent'):
+            bits[f'{status}_days'] |= 1 << (day.day - 1)
+    values = [{'student_id': student_id, 'month': month, **bits} for (student_id, month), bits in bitmaps.items()]
+    for position in range(0, len(values), 1000):
+        connection.execute(bitmap.insert(), values[position:position + 1000])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('attendance_bitmap', schema=None) as batch_op:
+        batch_op.drop_index('ix_attendance_bitmap_month')
+
+    op.drop_table('attendance_bitmap')
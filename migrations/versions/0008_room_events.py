@@ -0,0 +1,45 @@
+"""room events: check-in and check-out times per room for children and staff
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 08:31:52.904117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('room_event',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('class_id', sa.Integer(), nullable=False),
+    sa.Column('student_id', sa.Integer(), nullable=True),
+    sa.Column('staff_id', sa.Integer(), nullable=True),
+    sa.Column('event', sa.String(length=3), nullable=False),
+    sa.Column('at', sa.DateTime(), nullable=False),
+    sa.CheckConstraint('(student_id IS NULL) <> (staff_id IS NULL)', name='ck_room_event_one_person'),
+    sa.ForeignKeyConstraint(['class_id'], ['class.id'], ),
+    sa.ForeignKeyConstraint(['staff_id'], ['staff.id'], ),
+    sa.ForeignKeyConstraint(['student_id'], ['student.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('room_event', schema=None) as batch_op:
+        batch_op.create_index('ix_room_event_at', ['at'], unique=False)
+        batch_op.create_index('ix_room_event_student_id_at', ['student_id', 'at'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('room_event', schema=None) as batch_op:
+        batch_op.drop_index('ix_room_event_student_id_at')
+        batch_op.drop_index('ix_room_event_at')
+
+    op.drop_table('room_event')
@@ -1,21 +1,63 @@
-from fastapi import FastAPI, HTTPException, APIRouter
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import DeclarativeMeta, declarative_base
-from sqlalchemy.orm import sessionmaker
-from .database import SessionLocal
-from instance.config import SECRET_KEY, DATABASE_URI
+import asyncio
+from functools import partial
+from fastapi import FastAPI
+from .database import Base, Database, run_periodically
 
-starter = FastAPI(title="Storytime PreSchool", description="Providing childcare for children")
 
+def create_app(settings=None):
+    # Everything an app needs is built here rather than at import time, and
+    # engines and pools only on first use, so a server can preload the app
+    # once and fork workers cheaply, and tests can build isolated apps.
+    from instance.config import Settings
+    from preschool_app import routes
+    from preschool_app.autocomplete import NameIndex, rebuild_name_index
+    from preschool_app.dependencies import session_middleware
+    from preschool_app.live import Broadcaster, publish_snapshot
+    from preschool_app.occupancy import Occupancy, rebuild_occupancy
+    from preschool_app.schema_version import check_schema_version
 
-engine = create_engine(DATABASE_URI)
+    settings = settings or Settings()
+    app = FastAPI(title="Storytime PreSchool", description="Providing childcare for children")
+    app.state.settings = settings
+    app.state.name_index = NameIndex(settings.AUTOCOMPLETE_MAX_ENTRIES)
+    app.state.broadcaster = Broadcaster(settings.LIVE_QUEUE_SIZE)
+    app.state.occupancy = Occupancy()
+    app.state.database = Database(settings, session_info={
+        "name_index": app.state.name_index,
+        "broadcaster": app.state.broadcaster,
+        "occupancy": app.state.occupancy,
+    })
 
-SessionLocal = sessionmaker(autocommit = False, autoflush = False, bind = engine)
-Base: DeclarativeMeta = declarative_base()
+    app.include_router(routes.preschool_router)
+    app.include_router(routes.parent_router, prefix="/parent")
+    app.include_router(routes.staff_router, prefix="/staff")
+    app.middleware("http")(session_middleware)
 
+    @app.on_event("startup")
+    async def start_worker():
+        database = app.state.database
+        await check_schema_version(database.async_engine)
+        async with database.async_sessions() as db:
+            await rebuild_name_index(db, app.state.name_index)
+            await rebuild_occupancy(db, app.state.occupancy)
+        # Each worker's in-memory state only sees the writes it handled
+        # itself; these refreshes pick up the other workers' writes.
+        app.state.name_index_refresh = asyncio.create_task(run_periodically(
+            database, settings.AUTOCOMPLETE_REFRESH_SECONDS, partial(rebuild_name_index, name_index=app.state.name_index)
+        ))
+        app.state.live_snapshots = asyncio.create_task(run_periodically(
+            database, settings.LIVE_SNAPSHOT_SECONDS, partial(publish_snapshot, broadcaster=app.state.broadcaster)
+        ))
+        app.state.occupancy_refresh = asyncio.create_task(run_periodically(
+            database, settings.OCCUPANCY_REFRESH_SECONDS, partial(rebuild_occupancy, occupancy=app.state.occupancy)
+        ))
 
-from preschool_app import routes
-starter.include_router(routes.preschool_router)
-starter.include_router(routes.parent_router, prefix="/parent")
-starter.include_router(routes.staff_router, prefix="/staff")
+    @app.on_event("shutdown")
+    async def stop_worker():
+        for name in ("name_index_refresh", "live_snapshots", "occupancy_refresh"):
+            task = getattr(app.state, name, None)
+            if task is not None:
+                task.cancel()
+        await app.state.database.dispose()
 
+    return app
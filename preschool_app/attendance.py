@@ -0,0 +1,127 @@
+from datetime import date, datetime, time
+from sqlalchemy import Date, case, func, literal, select
+from preschool_app.bitmaps import bitmap_row, upsert_bitmaps
+from preschool_app.database import upsert
+from preschool_app.live import publish_attendance
+from preschool_app.models import Attendance, ClassAttendanceDay, Student, StudentAttendanceMonth
+
+
+def upsert_attendance(dialect, rows, update=("status", "date")):
+    # A row whose (student_id, attendance_day) is already marked updates that
+    # row's `update` columns instead: status and time for a single mark.
+    return upsert(dialect, Attendance.__table__, ("student_id", "attendance_day"), update, rows=rows)
+
+
+def attendance_row(student_id, status, marked_at):
+    return {"student_id": student_id, "status": status, "date": marked_at, "attendance_day": marked_at.date()}
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def next_month(day):
+    return date(day.year + day.month // 12, day.month % 12 + 1, 1)
+
+
+def status_counts():
+    return (
+        func.sum(case((Attendance.status == "present", 1), else_=0)).label("present"),
+        func.sum(case((Attendance.status == "absent", 1), else_=0)).label("absent"),
+    )
+
+
+def student_month_rollup(dialect, month, student_ids=None):
+    # Recounts the month for the given students (all when None) from at most
+    # one attendance row per student per day.
+    source = (
+        select(Attendance.student_id, literal(month, Date).label("month"), *status_counts())
+        .filter(Attendance.attendance_day >= month, Attendance.attendance_day < next_month(month))
+        .group_by(Attendance.student_id)
+    )
+    if student_ids is not None:
+        source = source.filter(Attendance.student_id.in_(student_ids))
+    return upsert(dialect, StudentAttendanceMonth.__table__, ("student_id", "month"), ("present", "absent"), source=source)
+
+
+def class_day_rollup(dialect, day, class_ids=None):
+    source = (
+        select(Student.class_id, literal(day, Date).label("attendance_day"), *status_counts())
+        .join(Student, Student.id == Attendance.student_id)
+        .filter(Attendance.attendance_day == day, Student.class_id.isnot(None))
+        .group_by(Student.class_id)
+    )
+    if class_ids is not None:
+        source = source.filter(Student.class_id.in_(class_ids))
+    return upsert(dialect, ClassAttendanceDay.__table__, ("class_id", "attendance_day"), ("present", "absent"), source=source)
+
+
+async def refresh_rollups(db, day, student_ids, class_ids):
+    # Runs in the attendance write's transaction, so reports never see a
+    # mark without its rollups. Recounting the touched keys rather than
+    # applying +1/-1 deltas keeps two concurrent taps from double counting.
+    dialect = db.get_bind().dialect.name
+    await db.execute(student_month_rollup(dialect, month_start(day), student_ids))
+    await db.execute(class_day_rollup(dialect, day, class_ids))
+
+
+async def write_attendance(db, day, rows, class_ids, update=("status", "date")):
+    # Every attendance write goes through here so the day's rows, the
+    # analytics bitmaps and the rollups change in one transaction, and the
+    # live dashboard hears about each one.
+    dialect = db.get_bind().dialect.name
+    await db.execute(upsert_attendance(dialect, rows, update))
+    month = month_start(day)
+    await db.execute(upsert_bitmaps(dialect, day, [bitmap_row(row["student_id"], month, day, row["status"]) for row in rows]))
+    await refresh_rollups(db, day, [row["student_id"] for row in rows], class_ids)
+    await publish_attendance(db, day, rows, class_ids)
+
+
+async def mark_student(db, student, status, marked_at):
+    rows = [attendance_row(student.id, status, marked_at)]
+    await write_attendance(db, marked_at.date(), rows, [student.class_id] if student.class_id else [])
+    return await db.scalar(
+        select(Attendance)
+        .filter(Attendance.student_id == student.id, Attendance.attendance_day == marked_at.date())
+        .execution_options(populate_existing=True)
+    )
+
+
+async def record_roll_call(db, class_id, day, entries):
+    # Marks a class for one day in a fixed number of statements whatever
+    # the roster size: the roster, the students already marked that day
+    # (only to report created vs updated), then one multi-row upsert each
+    # for attendance and bitmaps and the two rollup refreshes. The caller's transaction covers all of it.
+    # A roll call carries no per-student time: today's is stamped now and a
+    # past day's at midnight, and a student already marked keeps the time
+    # of that mark, only its status changes.
+    statuses = {entry.student_id: entry.status for entry in entries}
+    roster = set((await db.scalars(
+        select(Student.id).filter(Student.class_id == class_id, Student.id.in_(statuses))
+    )).all())
+    if roster:
+        marked = set((await db.scalars(
+            select(Attendance.student_id).filter(Attendance.student_id.in_(roster), Attendance.attendance_day == day)
+        )).all())
+        now = datetime.utcnow()
+        marked_at = now if day == now.date() else datetime.combine(day, time.min)
+        rows = [attendance_row(student_id, statuses[student_id], marked_at) for student_id in sorted(roster)]
+        await write_attendance(db, day, rows, [class_id], update=("status",))
+    else:
+        marked = set()
+
+    results = []
+    for entry in entries:
+        if entry.student_id not in roster:
+            result = "not_in_class"
+        elif entry.student_id in marked:
+            result = "updated"
+        else:
+            result = "created"
+        results.append({"student_id": entry.student_id, "status": entry.status, "result": result})
+    return results
+
+
+def attendance_rate(present, absent):
+    marked = present + absent
+    return round(present / marked, 4) if marked else None
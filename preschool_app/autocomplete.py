@@ -0,0 +1,145 @@
+import unicodedata
+from bisect import bisect_left, insort
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import object_session
+from preschool_app.database import after_commit
+from preschool_app.models import Student, Parent, Staff
+from instance.config import AUTOCOMPLETE_MAX_ENTRIES
+
+INDEXED = {
+    "student": Student,
+    "parent": Parent,
+    "staff": Staff,
+}
+
+MAX_KEY_LENGTH = 48
+
+
+def normalize(name):
+    decomposed = unicodedata.normalize("NFKD", name or "")
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.lower().split())
+
+
+def name_keys(name):
+    # One key per word so "olam" finds "Adebayo Olamide" as well as "adeb".
+    words = normalize(name).split()
+    return [" ".join(words[position:])[:MAX_KEY_LENGTH] for position in range(len(words))]
+
+
+class NameIndex:
+    # Sorted array of (key, kind, id, name) tuples. Lookups are two bisects
+    # plus a slice; writes are one insort per word. Entries past max_entries
+    # are dropped until the next rebuild.
+    def __init__(self, max_entries=AUTOCOMPLETE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = []
+        self.keys_by_ref = {}
+        self.truncated = False
+        self.replay = None
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, kind, ref_id, name):
+        self.remove(kind, ref_id)
+        if self.replay is not None:
+            self.replay.append(("add", kind, ref_id, name))
+        keys = name_keys(name)
+        if len(self.entries) + len(keys) > self.max_entries:
+            self.truncated = True
+            return
+        for key in keys:
+            insort(self.entries, (key, kind, ref_id, name))
+        self.keys_by_ref[(kind, ref_id)] = (keys, name)
+
+    def remove(self, kind, ref_id):
+        if self.replay is not None:
+            self.replay.append(("remove", kind, ref_id))
+        keys, name = self.keys_by_ref.pop((kind, ref_id), ((), None))
+        for key in keys:
+            entry = (key, kind, ref_id, name)
+            position = bisect_left(self.entries, entry)
+            if position < len(self.entries) and self.entries[position] == entry:
+                del self.entries[position]
+
+    def lookup(self, prefix, limit=10, kinds=None):
+        prefix = normalize(prefix)[:MAX_KEY_LENGTH]
+        if not prefix:
+            return []
+        hits = []
+        seen = set()
+        position = bisect_left(self.entries, (prefix,))
+        while position < len(self.entries) and len(hits) < limit:
+            key, kind, ref_id, name = self.entries[position]
+            if not key.startswith(prefix):
+                break
+            if (kind, ref_id) not in seen and (kinds is None or kind in kinds):
+                seen.add((kind, ref_id))
+                hits.append({"kind": kind, "id": ref_id, "name": name})
+            position += 1
+        return hits
+
+    def start_rebuild(self):
+        self.replay = []
+
+    def replace(self, rows):
+        # Adds and removes applied since start_rebuild() committed while the
+        # rebuild's SELECTs ran and may be missing from its rows, so they are
+        # replayed on the fresh index before it takes over. Replaying one the
+        # rows already hold changes nothing: add replaces the ref's entries
+        # and remove of an absent ref is a no-op.
+        fresh = NameIndex(self.max_entries)
+        for kind, ref_id, name in rows:
+            keys = name_keys(name)
+            if len(fresh.entries) + len(keys) > fresh.max_entries:
+                fresh.truncated = True
+                break
+            fresh.entries.extend((key, kind, ref_id, name) for key in keys)
+            fresh.keys_by_ref[(kind, ref_id)] = (keys, name)
+        fresh.entries.sort()
+        for method, *args in self.replay or ():
+            getattr(fresh, method)(*args)
+        # Swap in one step so concurrent lookups see the old or the new index.
+        self.entries, self.keys_by_ref, self.truncated = fresh.entries, fresh.keys_by_ref, fresh.truncated
+        self.replay = None
+
+
+async def rebuild_name_index(db, name_index):
+    rows = []
+    name_index.start_rebuild()
+    try:
+        for kind, model in INDEXED.items():
+            result = await db.execute(select(model.id, model.name).filter(model.name.isnot(None)))
+            rows.extend((kind, ref_id, name) for ref_id, name in result)
+        name_index.replace(rows)
+    finally:
+        name_index.replay = None
+
+
+def track_name_changes(kind, model):
+    # Each app's sessions carry its index in info["name_index"]; sessions
+    # without one (scripts, migrations) are ignored.
+    def on_commit(target, apply):
+        session = object_session(target)
+        name_index = session.info.get("name_index")
+        if name_index is not None:
+            after_commit(session, lambda: apply(name_index))
+
+    def on_insert(mapper, connection, target):
+        on_commit(target, lambda name_index: name_index.add(kind, target.id, target.name))
+
+    def on_update(mapper, connection, target):
+        if inspect(target).attrs.name.history.has_changes():
+            on_commit(target, lambda name_index: name_index.add(kind, target.id, target.name))
+
+    def on_delete(mapper, connection, target):
+        on_commit(target, lambda name_index: name_index.remove(kind, target.id))
+
+    event.listen(model, "after_insert", on_insert)
+    event.listen(model, "after_update", on_update)
+    event.listen(model, "after_delete", on_delete)
+
+
+for kind, model in INDEXED.items():
+    track_name_changes(kind, model)
@@ -0,0 +1,109 @@
+from sqlalchemy import select
+from preschool_app.database import upsert
+from preschool_app.models import AttendanceBitmap, Student
+
+
+def day_bit(day):
+    return 1 << (day.day - 1)
+
+
+def bitmap_row(student_id, month, day, status):
+    bit = day_bit(day)
+    return {
+        "student_id": student_id,
+        "month": month,
+        "present_days": bit if status == "present" else 0,
+        "absent_days": bit if status == "absent" else 0,
+    }
+
+
+def bitmap_update(day):
+    # Every row of one write is for the same day: clear that day's bit in
+    # both columns, then set the incoming one. The clear doesn't depend on
+    # the status, so a mark that is neither present nor absent leaves no
+    # stale bit behind. Idempotent, and needs no read.
+    keep = ~day_bit(day)
+    return {
+        name: lambda current, new, name=name: current[name].bitwise_and(keep).bitwise_or(new[name])
+        for name in ("present_days", "absent_days")
+    }
+
+
+def upsert_bitmaps(dialect, day, rows):
+    return upsert(dialect, AttendanceBitmap.__table__, ("student_id", "month"), bitmap_update(day), rows=rows)
+
+
+async def month_bitmaps(db, month, class_id=None):
+    query = select(AttendanceBitmap.student_id, AttendanceBitmap.present_days, AttendanceBitmap.absent_days).filter(
+        AttendanceBitmap.month == month
+    )
+    if class_id is not None:
+        query = query.join(Student, Student.id == AttendanceBitmap.student_id).filter(Student.class_id == class_id)
+    return (await db.execute(query.order_by(AttendanceBitmap.student_id))).all()
+
+
+def school_days(bitmaps):
+    # Days on which anyone in scope was marked at all.
+    days = 0
+    for _, present, absent in bitmaps:
+        days |= present | absent
+    return days
+
+
+def compress(mask, days):
+    # Packs mask's bits at the positions set in days into consecutive low
+    # bits, so weekends and closures don't break a run.
+    packed = 0
+    position = 0
+    while days:
+        lowest = days & -days
+        if mask & lowest:
+            packed |= 1 << position
+        position += 1
+        days ^= lowest
+    return packed
+
+
+def longest_run(mask):
+    # Each step shortens every run of set bits by one.
+    length = 0
+    while mask:
+        mask &= mask >> 1
+        length += 1
+    return length
+
+
+def perfect_attendance(bitmaps):
+    days = school_days(bitmaps)
+    students = [student_id for student_id, present, _ in bitmaps if days and present & days == days]
+    return days.bit_count(), students
+
+
+def absence_streaks(bitmaps, min_days):
+    days = school_days(bitmaps)
+    hits = []
+    for student_id, _, absent in bitmaps:
+        streak = longest_run(compress(absent, days))
+        if streak >= min_days:
+            hits.append({"student_id": student_id, "longest_absence": streak})
+    return sorted(hits, key=lambda hit: (-hit["longest_absence"], hit["student_id"]))
+
+
+def chronic_absence(bitmaps, threshold):
+    hits = []
+    for student_id, present, absent in bitmaps:
+        marked = (present | absent).bit_count()
+        absent_count = absent.bit_count()
+        if marked and absent_count / marked >= threshold:
+            hits.append({"student_id": student_id, "absent": absent_count, "marked": marked, "rate": round(absent_count / marked, 4)})
+    return sorted(hits, key=lambda hit: (-hit["rate"], hit["student_id"]))
+
+
+def co_presence(bitmaps, student_id, limit):
+    target = next((present for other, present, _ in bitmaps if other == student_id), 0)
+    hits = [
+        {"student_id": other, "days_together": (present & target).bit_count()}
+        for other, present, _ in bitmaps
+        if other != student_id and present & target
+    ]
+    return sorted(hits, key=lambda hit: (-hit["days_together"], hit["student_id"]))[:limit]
@@ -0,0 +1,99 @@
+from collections import Counter
+from sqlalchemy import delete, event, func, inspect, insert, literal, select
+from sqlalchemy.orm import Session
+from preschool_app.database import upsert
+from preschool_app.models import Class, EnrollmentCount, Program, Student
+
+SCHOOL = ("school", 0)
+
+
+def class_id_change(student):
+    history = inspect(student).attrs.class_id.history
+    before = (history.deleted or history.unchanged or [None])[0]
+    after = (history.added or history.unchanged or [None])[0]
+    return before, after
+
+
+def enrollment_deltas(session):
+    # Net change per counter from the students in this flush.
+    deltas = Counter()
+    for student in session.new:
+        if isinstance(student, Student):
+            deltas[SCHOOL] += 1
+            deltas["class", student.class_id] += 1
+    for student in session.deleted:
+        if isinstance(student, Student):
+            deltas[SCHOOL] -= 1
+            deltas["class", class_id_change(student)[0]] -= 1
+    for student in session.dirty:
+        if isinstance(student, Student):
+            before, after = class_id_change(student)
+            if before != after:
+                deltas["class", before] -= 1
+                deltas["class", after] += 1
+    return {key: delta for key, delta in deltas.items() if delta and key[1] is not None}
+
+
+@event.listens_for(Session, "after_flush")
+def count_enrollment_changes(session, flush_context):
+    # Applies the flush's deltas as `students = students + delta` in the same
+    # transaction, so concurrent writers never overwrite each other's counts.
+    # Core INSERT/DELETE statements on student bypass this; run
+    # rebuild_enrollment_counts() after bulk loads.
+    deltas = enrollment_deltas(session)
+    if not deltas:
+        return
+    rows = [{"scope": scope, "scope_id": scope_id, "students": delta} for (scope, scope_id), delta in sorted(deltas.items())]
+    connection = session.connection()
+    connection.execute(upsert(
+        connection.dialect.name, EnrollmentCount.__table__, ("scope", "scope_id"), ("students",), rows=rows, accumulate=True
+    ))
+
+
+def rebuild_enrollment_counts():
+    # Statements that recount every counter from the student table.
+    table = EnrollmentCount.__table__
+    columns = ["scope", "scope_id", "students"]
+    return [
+        delete(table),
+        insert(table).from_select(columns, select(literal(SCHOOL[0]), literal(SCHOOL[1]), func.count(Student.id))),
+        insert(table).from_select(columns, (
+            select(literal("class"), Student.class_id, func.count(Student.id))
+            .filter(Student.class_id.isnot(None))
+            .group_by(Student.class_id)
+        )),
+    ]
+
+
+def class_count_column():
+    return func.coalesce(EnrollmentCount.students, 0)
+
+
+def join_class_counts(query):
+    return query.outerjoin(
+        EnrollmentCount, (EnrollmentCount.scope == "class") & (EnrollmentCount.scope_id == Class.id)
+    )
+
+
+async def enrollment_stats(db):
+    # O(classes): one counter row for the school, one per class, and the
+    # per-program totals summed from the class counters.
+    total = await db.scalar(
+        select(EnrollmentCount.students).filter(EnrollmentCount.scope == SCHOOL[0], EnrollmentCount.scope_id == SCHOOL[1])
+    )
+    classes = (await db.execute(
+        join_class_counts(select(Class.id, Class.name, class_count_column().label("students"))).order_by(Class.id)
+    )).all()
+    programs = (await db.execute(
+        join_class_counts(
+            select(Program.id, Program.name, func.coalesce(func.sum(EnrollmentCount.students), 0).label("students"))
+            .outerjoin(Class, Class.program_id == Program.id)
+        )
+        .group_by(Program.id, Program.name)
+        .order_by(Program.id)
+    )).all()
+    return {
+        "total": total or 0,
+        "classes": [row._asdict() for row in classes],
+        "programs": [row._asdict() for row in programs],
+    }
@@ -1,12 +1,265 @@
-from sqlalchemy import create_engine
+import asyncio
+import logging
+import time
+from contextvars import ContextVar
+from functools import cached_property
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from instance.config import DATABASE_URI
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from sqlalchemy.sql.dml import UpdateBase
 
-SQLALCHEMY_DATABASE_URL = DATABASE_URI
+logger = logging.getLogger(__name__)
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+# Sync drivers and the asyncio driver used in their place when
+# ASYNC_DATABASE_URI is not set explicitly.
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "mysql": "mysql+aiomysql",
+}
+
+
+def to_async_url(url):
+    url = make_url(url)
+    if url.get_dialect().is_async:
+        return url
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No asyncio driver configured for '{backend}' databases, set ASYNC_DATABASE_URI")
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+
+# Dialects with an INSERT that can update on a key conflict.
+DIALECT_INSERTS = {
+    "mysql": mysql.insert,
+    "sqlite": sqlite.insert,
+    "postgresql": postgresql.insert,
+}
+
+
+def upsert(dialect, table, key, update, rows=None, source=None, accumulate=False):
+    # INSERT of rows (or of a SELECT's result) where a row whose key already
+    # exists gets its `update` columns overwritten instead, or incremented
+    # by the new values when accumulate is set. `update` may also map each
+    # column to combine(current, new) -> expression, where current and new
+    # are the existing and incoming row's columns.
+    if dialect not in DIALECT_INSERTS:
+        raise NotImplementedError(f"No upsert for '{dialect}' databases")
+    statement = DIALECT_INSERTS[dialect](table)
+    if source is None:
+        statement = statement.values(rows)
+    else:
+        statement = statement.from_select([column.name for column in source.selected_columns], source)
+    new = statement.inserted if dialect == "mysql" else statement.excluded
+    if isinstance(update, dict):
+        values = {name: combine(table.c, new) for name, combine in update.items()}
+    else:
+        values = {name: table.c[name] + new[name] if accumulate else new[name] for name in update}
+    if dialect == "mysql":
+        return statement.on_duplicate_key_update(values)
+    return statement.on_conflict_do_update(index_elements=list(key), set_=values)
+
+
+class PoolMetrics:
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, waited, timed_out=False):
+        self.checkouts += 1
+        self.timeouts += timed_out
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+
+    def snapshot(self):
+        return {
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "avg_wait_ms": round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+        }
+
+
+# Time spent opening a DBAPI connection: the engine's do_connect event
+# fires just before the driver connects, the pool's connect event just after.
+def connect_started(dialect, connection_record, cargs, cparams):
+    connection_record.info["connect_started"] = time.perf_counter()
+
+
+def connect_finished(dbapi_connection, connection_record):
+    started = connection_record.info.pop("connect_started", None)
+    if started is not None:
+        connection_record.info["connect_seconds"] = time.perf_counter() - started
+
+
+class MeteredAsyncQueuePool(AsyncAdaptedQueuePool):
+    # Times every checkout, including the wait for a free connection when
+    # pool_size + max_overflow connections are already in use. Opening a
+    # new connection is not waiting for one, so that time is left out.
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+        event.listen(self, "connect", connect_finished)
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            self.metrics.record(time.perf_counter() - start, timed_out=True)
+            raise
+        opening = connection.info.pop("connect_seconds", 0.0)
+        self.metrics.record(time.perf_counter() - start - opening)
+        return connection
+
+
+def engine_options(url, settings):
+    options = {"pool_pre_ping": settings.POOL_PRE_PING}
+    # SQLite picks its own pool per file/memory database; sizing only
+    # applies to server databases.
+    if make_url(url).get_backend_name() != "sqlite":
+        options.update(
+            poolclass=MeteredAsyncQueuePool,
+            pool_size=settings.POOL_SIZE,
+            max_overflow=settings.MAX_OVERFLOW,
+            pool_timeout=settings.POOL_TIMEOUT,
+            pool_recycle=settings.POOL_RECYCLE,
+        )
+    return options
+
+
+def make_engine(url, settings):
+    engine = create_async_engine(url, **engine_options(url, settings))
+    if isinstance(engine.sync_engine.pool, MeteredAsyncQueuePool):
+        event.listen(engine.sync_engine, "do_connect", connect_started)
+    return engine
+
+
+def pool_status(engine):
+    pool = engine.pool
+    status = {"pool": type(pool).__name__, "status": pool.status()}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            max_overflow=pool._max_overflow,
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+        )
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        status.update(metrics.snapshot())
+    return status
+
+
+class RoutingSession(Session):
+    # Sends reads to info["replica"] while info["use_replica"] is set (the
+    # middleware sets it for GET requests). Flushes, DML and SELECT ... FOR
+    # UPDATE go to the primary, and so does every statement after the first
+    # write so a request always reads its own writes.
+    def get_bind(self, mapper=None, clause=None, **kw):
+        replica = self.info.get("replica")
+        if self._flushing or isinstance(clause, UpdateBase) or getattr(clause, "_for_update_arg", None) is not None:
+            self.info["wrote"] = True
+        elif replica is not None and self.info.get("use_replica") and not self.info.get("wrote"):
+            return replica
+        return super().get_bind(mapper, clause=clause, **kw)
+
+
+class Database:
+    # Engines and session factories for one app. Each is built on first
+    # use, so creating an app opens nothing: a preloaded app forks into
+    # workers that each build their own pools after the fork.
+    def __init__(self, settings, session_info=None):
+        self.settings = settings
+        # Copied into every async session's info, e.g. the app's name index.
+        self.session_info = session_info or {}
+
+    @cached_property
+    def async_engine(self):
+        url = self.settings.ASYNC_DATABASE_URI or to_async_url(self.settings.DATABASE_URI)
+        return make_engine(url, self.settings)
+
+    @cached_property
+    def replica_engine(self):
+        url = self.settings.REPLICA_DATABASE_URI
+        return make_engine(to_async_url(url), self.settings) if url else None
+
+    @cached_property
+    def async_sessions(self):
+        replica = self.replica_engine
+        info = dict(self.session_info, replica=replica.sync_engine if replica is not None else None)
+        # expire_on_commit is off so handlers can serialize objects after
+        # commit without a lazy refresh, which is not allowed under asyncio.
+        return async_sessionmaker(
+            self.async_engine, sync_session_class=RoutingSession, autoflush=False, expire_on_commit=False, info=info
+        )
+
+    def built_engines(self):
+        # Sync-facing engines that exist so far, keyed for the pool endpoint.
+        names = {"async": "async_engine", "replica": "replica_engine"}
+        engines = {}
+        for label, attribute in names.items():
+            built = self.__dict__.get(attribute)
+            if built is not None:
+                engines[label] = built.sync_engine
+        return engines
+
+    async def dispose(self):
+        for attribute in ("async_engine", "replica_engine"):
+            built = self.__dict__.get(attribute)
+            if built is not None:
+                await built.dispose()
+
+
+async def run_periodically(database, interval, refresh):
+    # Awaits refresh(db) with a fresh session every interval seconds for
+    # the life of the worker. Nothing awaits the task until shutdown, so a
+    # failure is logged and retried on the next tick instead of ending it.
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with database.async_sessions() as db:
+                await refresh(db)
+        except Exception:
+            name = getattr(refresh, "func", refresh).__name__
+            logger.exception("Periodic %s failed; retrying in %ss", name, interval)
+
+
+# Session for the request being handled, set by the session middleware so
+# every dependency and helper in one request shares a single unit of work.
+request_session: ContextVar = ContextVar("request_session", default=None)
+
+
+def after_commit(session, callback):
+    # Run callback once the session's outermost transaction commits; dropped
+    # if it ends any other way. Use it for in-process state that must only
+    # reflect committed rows.
+    session.info.setdefault("after_commit", []).append(callback)
+
+
+@event.listens_for(Session, "after_commit")
+def run_after_commit_callbacks(session):
+    # Releasing a SAVEPOINT (begin_nested) fires after_commit too, but its
+    # rows are still only as durable as the transaction around it.
+    if session.in_nested_transaction():
+        return
+    for callback in session.info.pop("after_commit", []):
+        callback()
+
+
+@event.listens_for(Session, "after_transaction_end")
+def discard_after_commit_callbacks(session, transaction):
+    # The outermost transaction ended without running them above: it was
+    # rolled back or closed. A rolled-back SAVEPOINT leaves them queued.
+    if transaction.parent is None:
+        session.info.pop("after_commit", None)
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -1,36 +1,71 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from preschool_app.database import SessionLocal
+from jose import JWTError, jwt
+from sqlalchemy import select
+from sqlalchemy.orm import with_expression
+from sqlalchemy.ext.asyncio import AsyncSession
+from preschool_app.database import request_session
+from preschool_app.authorize import ALGORITHM
 from preschool_app import models  # Add this line to import your models
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_async_db(request: Request):
+    db = request_session.get()
+    if db is not None:
+        yield db
+        return
+    async with request.app.state.database.async_sessions() as db:
         yield db
-    finally:
-        db.close()
 
+READ_METHODS = {"GET", "HEAD"}
+
+async def session_middleware(request: Request, call_next):
+    async with request.app.state.database.async_sessions() as db:
+        db.info["use_replica"] = request.method in READ_METHODS and request.headers.get("X-Force-Primary") != "1"
+        token = request_session.set(db)
+        try:
+            response = await call_next(request)
+            if response.status_code < 400:
+                await db.commit()
+            else:
+                await db.rollback()
+        except Exception:
+            await db.rollback()
+            raise
+        finally:
+            request_session.reset(token)
+    return response
 
+async def use_primary(db: AsyncSession = Depends(get_async_db)):
+    # For GET routes whose callers read back what they just wrote (the
+    # attendance rollups after a roll call, room events after a check-in),
+    # which a lagging replica would not have yet.
+    db.info["use_replica"] = False
+    return db
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+
+async def get_current_user(request: Request, token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, request.app.state.settings.SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
         if email is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
 
-    db_user = db.query(models.User).filter(models.User.user_email == email).first()
-    if db_user is None:
+    # Staff tokens carry the email as "sub"; permission checks compare the
+    # staff member's role name, read in the same query.
+    role_name = select(models.Role.name).filter(models.Role.id == models.Staff.role_id).scalar_subquery()
+    staff = await db.scalar(
+        select(models.Staff).options(with_expression(models.Staff.role, role_name)).filter(models.Staff.email == email)
+    )
+    if staff is None:
         raise credentials_exception
 
-    return db_user
+    return staff
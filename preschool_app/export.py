@@ -0,0 +1,74 @@
+import csv
+import io
+import json
+from sqlalchemy import select
+from preschool_app.models import Attendance, Student
+
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_COLUMNS = ("attendance_day", "student_id", "student_name", "class_id", "status", "marked_at")
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def attendance_export_query(day_from, day_to, class_id=None):
+    query = (
+        select(
+            Attendance.attendance_day,
+            Attendance.student_id,
+            Student.name.label("student_name"),
+            Student.class_id,
+            Attendance.status,
+            Attendance.date.label("marked_at"),
+        )
+        .join(Student, Student.id == Attendance.student_id)
+        .filter(Attendance.attendance_day >= day_from, Attendance.attendance_day <= day_to)
+        .order_by(Attendance.attendance_day, Attendance.student_id)
+    )
+    if class_id is not None:
+        query = query.filter(Student.class_id == class_id)
+    return query
+
+
+def csv_chunk(rows, header=False):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_COLUMNS)
+    writer.writerows(
+        (day.isoformat(), student_id, student_name, class_id, status, marked_at.isoformat() if marked_at else "")
+        for day, student_id, student_name, class_id, status, marked_at in rows
+    )
+    return buffer.getvalue()
+
+
+def ndjson_chunk(rows, header=False):
+    return "".join(
+        json.dumps(dict(zip(EXPORT_COLUMNS, row)), default=lambda value: value.isoformat()) + "\n" for row in rows
+    )
+
+
+CHUNK_WRITERS = {
+    "csv": csv_chunk,
+    "ndjson": ndjson_chunk,
+}
+
+
+async def stream_attendance(database, query, format):
+    # Runs after the handler has returned, so it opens its own session
+    # rather than the request's, which is closed by then. yield_per makes
+    # the driver use a server-side cursor; at most one batch of rows is in
+    # memory at a time however long the range is.
+    write_chunk = CHUNK_WRITERS[format]
+    header = True
+    async with database.async_sessions() as db:
+        db.info["use_replica"] = True
+        result = await db.stream(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        async for rows in result.partitions():
+            yield write_chunk(rows, header)
+            header = False
+    if header and format == "csv":
+        yield write_chunk([], header)
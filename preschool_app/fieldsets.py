@@ -0,0 +1,28 @@
+from typing import Optional
+from fastapi import HTTPException, Query
+
+
+class SparseFields:
+    # Dependency for ?fields=a,b,c. Names are checked against the columns
+    # the response schema exposes, and the result is the list of mapped
+    # columns to SELECT, so unrequested columns never leave the database.
+    def __init__(self, schema, model):
+        table_columns = model.__table__.columns
+        self.model = model
+        self.allowed = [name for name in schema.model_fields if name in table_columns]
+        self.columns = [getattr(model, name) for name in self.allowed]
+
+    def __call__(self, fields: Optional[str] = Query(None, description="Comma-separated fields to return")):
+        if not fields:
+            return None
+        requested = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+        unknown = [name for name in requested if name not in self.allowed]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields: {', '.join(unknown)}. Available fields: {', '.join(self.allowed)}",
+            )
+        # id is always returned, it is the pagination key.
+        if "id" not in requested:
+            requested.insert(0, "id")
+        return [getattr(self.model, name) for name in requested]
@@ -0,0 +1,122 @@
+import asyncio
+from datetime import datetime
+from sqlalchemy import func, select
+from preschool_app.counters import class_count_column, join_class_counts
+from preschool_app.database import after_commit
+from preschool_app.models import Class, ClassAttendanceDay
+from instance.config import LIVE_QUEUE_SIZE
+
+
+class Broadcaster:
+    # One per worker: fans dashboard events out to that worker's connected
+    # clients. Each client has a bounded queue; a client that falls that far
+    # behind is dropped (it gets None) and reconnects for a fresh snapshot,
+    # so one slow tablet never holds memory for everyone else.
+    def __init__(self, queue_size=LIVE_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self.subscribers = set()
+        self.last_snapshot = None
+
+    def __len__(self):
+        return len(self.subscribers)
+
+    def subscribe(self):
+        queue = asyncio.Queue(self.queue_size)
+        self.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue):
+        self.subscribers.discard(queue)
+
+    def publish(self, event):
+        for queue in list(self.subscribers):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self.unsubscribe(queue)
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+
+
+def live_day():
+    # The dashboard follows the same UTC day attendance rows are filed under.
+    return datetime.utcnow().date()
+
+
+def class_counts_query(day, class_ids=None):
+    query = join_class_counts(
+        select(
+            Class.id,
+            Class.name,
+            class_count_column().label("students"),
+            func.coalesce(ClassAttendanceDay.present, 0).label("present"),
+            func.coalesce(ClassAttendanceDay.absent, 0).label("absent"),
+        )
+    ).outerjoin(
+        ClassAttendanceDay, (ClassAttendanceDay.class_id == Class.id) & (ClassAttendanceDay.attendance_day == day)
+    ).order_by(Class.id)
+    if class_ids is not None:
+        query = query.filter(Class.id.in_(class_ids))
+    return query
+
+
+async def class_counts(db, day, class_ids=None):
+    result = await db.execute(class_counts_query(day, class_ids))
+    return [
+        {"class_id": class_id, "name": name, "students": students, "present": present, "absent": absent}
+        for class_id, name, students, present, absent in result
+    ]
+
+
+async def attendance_snapshot(db, day):
+    # One row per class read from the day rollup, not a scan of attendance.
+    return {"type": "snapshot", "day": day.isoformat(), "classes": await class_counts(db, day)}
+
+
+async def wait_for_disconnect(websocket):
+    # Dashboards send nothing we use; reading is only how a closed tab is
+    # noticed while its handler is otherwise waiting on the queue.
+    while (await websocket.receive())["type"] != "websocket.disconnect":
+        pass
+
+
+async def next_event(queue, disconnected):
+    # The client's next event, or None once it has disconnected or has been
+    # dropped by the broadcaster.
+    get = asyncio.ensure_future(queue.get())
+    await asyncio.wait({get, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+    if disconnected.done():
+        get.cancel()
+        return None
+    return get.result()
+
+
+async def publish_attendance(db, day, rows, class_ids):
+    # Called from the attendance write path inside its transaction: reads
+    # the touched classes' fresh counts and sends them once the write
+    # commits. Sessions without a broadcaster (scripts, exports) skip it.
+    broadcaster = db.info.get("broadcaster")
+    if broadcaster is None or not broadcaster.subscribers or day != live_day():
+        return
+    event = {
+        "type": "attendance",
+        "day": day.isoformat(),
+        "classes": await class_counts(db, day, class_ids) if class_ids else [],
+        "students": [{"student_id": row["student_id"], "status": row["status"]} for row in rows],
+    }
+    after_commit(db.sync_session, lambda: broadcaster.publish(event))
+
+
+async def publish_snapshot(db, broadcaster):
+    # Run by each worker every LIVE_SNAPSHOT_SECONDS. Marks taken through
+    # other workers never reach this broadcaster directly, so the snapshot
+    # is re-sent whenever the counts (or the day) have moved since the last
+    # one, and every dashboard converges within one interval.
+    if not broadcaster.subscribers:
+        broadcaster.last_snapshot = None
+        return
+    snapshot = await attendance_snapshot(db, live_day())
+    if snapshot != broadcaster.last_snapshot:
+        broadcaster.publish(snapshot)
+        broadcaster.last_snapshot = snapshot
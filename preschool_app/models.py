@@ -1,53 +1,66 @@
+import unicodedata
 from datetime import datetime
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Text, DateTime, CheckConstraint, Float, func
-from sqlalchemy.orm import relationship, sessionmaker, registry
+from sqlalchemy import Boolean, Column, ForeignKey, Index, Integer, String, Text, Date, DateTime, CheckConstraint, Float, func
+from sqlalchemy.orm import query_expression, relationship, registry, validates
 from sqlalchemy.ext.declarative import declarative_base
-from preschool_app import Base, engine
+from preschool_app import Base
 from pydantic import BaseModel
 
-
-Session = sessionmaker(bind=engine)
-session = Session()
-
 mapper_registry = registry()
 mapper_registry.configure()
 
 Base = declarative_base()
 
 
+def normalize_name(name):
+    return " ".join(unicodedata.normalize("NFKC", name or "").casefold().split())
+
+
+class NormalizedNameMixin:
+    # Unique key for lookup-table names: duplicates are rejected by the
+    # index on insert, so checks need neither func.lower() scans nor a
+    # separate SELECT that can race with another create.
+    name_key = Column(String(length=200), unique=True, index=True, nullable=False)
+
+    @validates("name")
+    def set_name_key(self, key, value):
+        self.name_key = normalize_name(value)
+        return value
+
+
 
-class Program(Base):
+class Program(NormalizedNameMixin, Base):
     __tablename__ = "program"
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String(length=200), index=True)
-    description = Column(Text, index=True)
+    description = Column(Text)
 
     classes = relationship("Class", back_populates="program")
 
 
 class Emergency(Base):
     __tablename__ = "emergency" 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String(length=200), index=True)
     phone = Column(String(length=80), index=True)
 
 
-class Gender(Base):
+class Gender(NormalizedNameMixin, Base):
     __tablename__ = "gender"
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String(length=200), index=True)
 
 
 class MedicalCategory(Base):
     __tablename__ = "medical_category"
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String(length=200), index=True)
 
     conditions = relationship("MedicalCondition", back_populates="medical_category")
 
 class MedicalCondition(Base):
     __tablename__ = "medical"
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String(length=200), index=True)
     medical_category_id = Column(Integer, ForeignKey("medical_category.id"))
 
@@ -56,17 +69,17 @@ class MedicalCondition(Base):
 
 
 
-class Department(Base):
+class Department(NormalizedNameMixin, Base):
     __tablename__ = "department"  
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String(length=200), index=True)
 
     staff_members = relationship("Staff", back_populates="department")
 
 
-class Role(Base):
+class Role(NormalizedNameMixin, Base):
     __tablename__ = "role"
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String(length=200), index=True)
     staff_id = Column(Integer, ForeignKey("staff.id"), nullable = True) 
 
@@ -74,24 +87,33 @@ class Role(Base):
 
 class Staff(Base):
     __tablename__ = "staff"
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String(length=200), index=True)
-    age = Column(Integer, CheckConstraint("age >= 15"), index=True)
+    age = Column(Integer, CheckConstraint("age >= 15"))
     gender_id = Column(Integer, ForeignKey("gender.id"))
-    address = Column(Text, index=True)
+    address = Column(Text)
     email = Column(String(length=120), unique=True, index=True)
     phone = Column(String(length=80), index=True)
-    password = Column(String(length=100), index=True)
-    hashedpassword = Column(String(length=100), index=True)
+    password = Column(String(length=100))
+    hashedpassword = Column(String(length=100))
     department_id = Column(Integer, ForeignKey("department.id"))
     role_id = Column(Integer, ForeignKey("role.id"))
-    image = Column(String(length=120), index=True)
+    image = Column(String(length=120))
+    # The role's name, only where a query asks for it with
+    # with_expression(Staff.role, ...); see get_current_user.
+    role = query_expression()
 
     department = relationship("Department", back_populates="staff_members")
     teacher = relationship("Teacher", back_populates="staff")
     medical_conditions = relationship("MedicalCondition", secondary="staff_medical_condition_association")
     schedule = relationship("Schedule", back_populates="staff")
 
+    # Role and department listings group staff by these foreign keys.
+    __table_args__ = (
+        Index("ix_staff_role_id", "role_id"),
+        Index("ix_staff_department_id", "department_id"),
+    )
+
 
 class StaffMedicalConditionAssociation(Base):
     __tablename__ = "staff_medical_condition_association"
@@ -101,7 +123,7 @@ class StaffMedicalConditionAssociation(Base):
 
 class Teacher(Base):
     __tablename__ = "teacher"
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     staff_id = Column(Integer, ForeignKey("staff.id"))
 
     staff = relationship("Staff", back_populates="teacher")
@@ -117,9 +139,9 @@ class TeacherClassAssociation(Base):
     class_id = Column(Integer, ForeignKey("class.id"), primary_key=True)
 
 
-class Class(Base):
+class Class(NormalizedNameMixin, Base):
     __tablename__ = "class"
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String(length=200), index=True)
     program_id = Column(Integer, ForeignKey("program.id"))
     class_teacher_id = Column(Integer, ForeignKey("teacher.id"), nullable=True)
@@ -134,16 +156,16 @@ class Class(Base):
 
 class Student(Base):
     __tablename__ = "student"
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String(length=200), index=True)
     age = Column(Integer, CheckConstraint("age <= 10"), index=True)
-    address = Column(Text, index=True)
+    address = Column(Text)
     gender_id = Column(Integer, ForeignKey("gender.id"))
     class_id = Column(Integer, ForeignKey("class.id"))
     emergency_contact_id = Column(Integer, ForeignKey("emergency.id"))
     medical_condition_id = Column(Integer, ForeignKey("medical.id"))
-    is_disable = Column(Boolean, default=False, index=True)
-    image = Column(String(length=120), index=True)
+    is_disable = Column(Boolean, default=False)
+    image = Column(String(length=120))
 
     student_class = relationship("Class", secondary="class_student_association", back_populates="class_student", viewonly=True)
     class_deets = relationship("Class", back_populates="students")
@@ -151,6 +173,13 @@ class Student(Base):
     bills = relationship("Billing", back_populates="student")
     payments = relationship("Payment", back_populates="student", foreign_keys="[Payment.student_id]")
 
+    # Composite indexes for /students/search: equality filter first, age range last.
+    __table_args__ = (
+        Index("ix_student_class_id_age", "class_id", "age"),
+        Index("ix_student_gender_id_age", "gender_id", "age"),
+        Index("ix_student_is_disable_age", "is_disable", "age"),
+    )
+
 
 
 Student.attendance = relationship("Attendance", back_populates="student")
@@ -171,10 +200,15 @@ class StudentMedicalConditionAssociation(Base):
     student_id = Column(Integer, ForeignKey("student.id"), primary_key=True)
     medical_condition_id = Column(Integer, ForeignKey("medical.id"), primary_key=True)
 
+    # The primary key covers student -> conditions; this covers condition -> students.
+    __table_args__ = (
+        Index("ix_student_medical_condition_reverse", "medical_condition_id", "student_id"),
+    )
+
 
 class Admission(Base):
     __tablename__ = "admission"
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     student_id = Column(Integer, ForeignKey("student.id"))
     program_id = Column(Integer, ForeignKey("program.id"))
     student_number = Column(String(length=20), index=True)
@@ -190,66 +224,157 @@ class Admission(Base):
 
 class Parent(Base):
     __tablename__ = "parent"
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String(length=200), index=True)
-    age = Column(Integer, CheckConstraint("age >= 15"), index=True)
+    age = Column(Integer, CheckConstraint("age >= 15"))
     gender_id = Column(Integer, ForeignKey("gender.id"))
     address = Column(Text)
     email = Column(String(length=120), unique=True, index=True)
     phone = Column(String(length=80), index=True)
-    password = Column(String(length=100), index=True)
-    hashedpassword = Column(String(length=100), index=True)
+    password = Column(String(length=100))
+    hashedpassword = Column(String(length=100))
 
 class Attendance(Base):
     __tablename__ = "attendance"
-    id = Column(Integer, primary_key=True, index=True)
-    date = Column(DateTime, default=datetime.utcnow, index=True)
+    id = Column(Integer, primary_key=True)
+    date = Column(DateTime, default=datetime.utcnow)
+    # Calendar day of `date`; a student has at most one row per day.
+    attendance_day = Column(Date, default=lambda: datetime.utcnow().date(), nullable=False)
     student_id = Column(Integer, ForeignKey("student.id"))
-    status = Column(String(length=10), default="absent", index=True)  # "present" or "absent"
+    status = Column(String(length=10), default="absent")  # "present" or "absent"
 
     student = relationship("Student", back_populates="attendance")
 
+    @validates("date")
+    def set_attendance_day(self, key, value):
+        self.attendance_day = value.date() if value is not None else None
+        return value
+
+    # The unique key is the upsert target and serves a student's history;
+    # the second index serves "who is here today".
+    __table_args__ = (
+        Index("ix_attendance_student_id_attendance_day", "student_id", "attendance_day", unique=True),
+        Index("ix_attendance_attendance_day_status", "attendance_day", "status"),
+    )
+
+
+class StudentAttendanceMonth(Base):
+    # Rollup of attendance per student per calendar month, rewritten for the
+    # students touched by each attendance write (see attendance.py).
+    __tablename__ = "student_attendance_month"
+    student_id = Column(Integer, ForeignKey("student.id"), primary_key=True)
+    month = Column(Date, primary_key=True)  # first day of the month
+    present = Column(Integer, default=0, nullable=False)
+    absent = Column(Integer, default=0, nullable=False)
+
+
+class ClassAttendanceDay(Base):
+    # Rollup of attendance per class per day, counting students by the class
+    # they were in when the day was last written.
+    __tablename__ = "class_attendance_day"
+    class_id = Column(Integer, ForeignKey("class.id"), primary_key=True)
+    attendance_day = Column(Date, primary_key=True)
+    present = Column(Integer, default=0, nullable=False)
+    absent = Column(Integer, default=0, nullable=False)
+
+
+class AttendanceBitmap(Base):
+    # One bit per day of the month (bit 0 is the 1st) for each student,
+    # written with every attendance mark; see bitmaps.py.
+    __tablename__ = "attendance_bitmap"
+    student_id = Column(Integer, ForeignKey("student.id"), primary_key=True)
+    month = Column(Date, primary_key=True)  # first day of the month
+    present_days = Column(Integer, default=0, nullable=False)
+    absent_days = Column(Integer, default=0, nullable=False)
+
+    __table_args__ = (
+        Index("ix_attendance_bitmap_month", "month"),
+    )
+
+
+class EnrollmentCount(Base):
+    # Student counters kept current by counters.py on every flush: the
+    # whole school (scope "school", scope_id 0) and each class.
+    __tablename__ = "enrollment_count"
+    scope = Column(String(length=20), primary_key=True)
+    scope_id = Column(Integer, primary_key=True)
+    students = Column(Integer, default=0, nullable=False)
+
+
+class RoomEvent(Base):
+    # A child or a member of staff arriving in ("in") or leaving ("out") a
+    # class's room; exactly one of student_id and staff_id is set. Rows are
+    # only ever appended, so the latest id per person is where they are.
+    __tablename__ = "room_event"
+    id = Column(Integer, primary_key=True)
+    class_id = Column(Integer, ForeignKey("class.id"), nullable=False)
+    student_id = Column(Integer, ForeignKey("student.id"), nullable=True)
+    staff_id = Column(Integer, ForeignKey("staff.id"), nullable=True)
+    event = Column(String(length=3), nullable=False)
+    at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    # The first index rebuilds today's occupancy, the second serves a
+    # child's arrival and pickup times.
+    __table_args__ = (
+        CheckConstraint("(student_id IS NULL) <> (staff_id IS NULL)", name="ck_room_event_one_person"),
+        Index("ix_room_event_at", "at"),
+        Index("ix_room_event_student_id_at", "student_id", "at"),
+    )
+
 
 class DailyActivity(Base):
     __tablename__ = "daily_activity"
-    id = Column(Integer, primary_key=True, index=True)
-    date = Column(DateTime, default=datetime.utcnow, index=True)
-    description = Column(String(length=200), index=True)
+    id = Column(Integer, primary_key=True)
+    date = Column(DateTime, default=datetime.utcnow)
+    description = Column(String(length=200))
     notes = Column(Text, nullable=True)
     student_id = Column(Integer, ForeignKey("student.id"))
 
     student = relationship("Student", back_populates="daily_activities")
 
+    __table_args__ = (
+        Index("ix_daily_activity_student_id_date", "student_id", "date"),
+    )
+
 
 class Billing(Base):
     __tablename__ = "billing"
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     student_id = Column(Integer, ForeignKey("student.id"))
-    amount = Column(Float, index=True)
-    due_date = Column(DateTime, index=True)
-    status = Column(String(length=20), default="pending", index=True)  # "paid", "pending", "overdue"
+    amount = Column(Float)
+    due_date = Column(DateTime)
+    status = Column(String(length=20), default="pending")  # "paid", "pending", "overdue"
 
     student = relationship("Student", back_populates="bills")
     payments = relationship("Payment", back_populates="bill")  
 
+    # A student's bills by status, oldest due first.
+    __table_args__ = (
+        Index("ix_billing_student_id_status_due_date", "student_id", "status", "due_date"),
+    )
+
 class Payment(Base):
     __tablename__ = "payment"
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     bill_id = Column(Integer, ForeignKey("billing.id"))
     payment_date = Column(DateTime, default=func.now(), index=True)
-    amount_paid = Column(Float, index=True)
-    payment_method = Column(String(length=20), index=True)  # "credit_card", "bank_transfer", etc.
+    amount_paid = Column(Float)
+    payment_method = Column(String(length=20))  # "credit_card", "bank_transfer", etc.
 
     student_id = Column(Integer, ForeignKey("student.id"))
     student = relationship("Student", back_populates="payments", primaryjoin="Payment.student_id == Student.id")
 
     bill = relationship("Billing", back_populates="payments")
 
+    __table_args__ = (
+        Index("ix_payment_bill_id_payment_date", "bill_id", "payment_date"),
+    )
+
 
 
 class Schedule(Base):
     __tablename__ = "schedule"
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     staff_id = Column(Integer, ForeignKey("staff.id"))
     day_of_week = Column(String(length=20), index=True)
     start_time = Column(DateTime)
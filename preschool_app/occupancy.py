@@ -0,0 +1,105 @@
+from datetime import datetime, time
+from sqlalchemy import func, select
+from preschool_app.database import after_commit
+from preschool_app.models import RoomEvent
+
+KINDS = ("children", "staff")
+
+
+def person(student_id, staff_id):
+    return ("children", student_id) if student_id is not None else ("staff", staff_id)
+
+
+class Occupancy:
+    # Who is in which room right now, held by each worker. An event is one
+    # dict and one set operation, and a headcount is len() of a set, so
+    # neither touches the day's events. Checking in moves a person out of
+    # any other room; checking out removes them from wherever they are.
+    def __init__(self):
+        self.rooms = {}
+        self.locations = {}
+        self.replay = None
+
+    def check_in(self, kind, person_id, class_id):
+        self.check_out(kind, person_id)
+        self.rooms.setdefault(class_id, {name: set() for name in KINDS})[kind].add(person_id)
+        self.locations[(kind, person_id)] = class_id
+
+    def check_out(self, kind, person_id):
+        class_id = self.locations.pop((kind, person_id), None)
+        if class_id is not None:
+            self.rooms[class_id][kind].discard(person_id)
+
+    def apply(self, event, kind, person_id, class_id):
+        if self.replay is not None:
+            self.replay.append((event, kind, person_id, class_id))
+        if event == "in":
+            self.check_in(kind, person_id, class_id)
+        else:
+            self.check_out(kind, person_id)
+
+    def room(self, class_id):
+        people = self.rooms.get(class_id, {})
+        children = len(people.get("children", ()))
+        staff = len(people.get("staff", ()))
+        return {
+            "class_id": class_id,
+            "children": children,
+            "staff": staff,
+            "children_per_staff": round(children / staff, 2) if staff else None,
+        }
+
+    def occupied(self):
+        return [self.room(class_id) for class_id, people in sorted(self.rooms.items()) if any(people.values())]
+
+    def start_rebuild(self):
+        self.replay = []
+
+    def replace(self, events):
+        # Events applied since start_rebuild() committed while the rebuild's
+        # SELECT ran and may be missing from its rows, so they are replayed
+        # on the fresh rooms before these take over. Replaying one the rows
+        # already hold changes nothing: check-in and check-out are
+        # idempotent.
+        fresh = Occupancy()
+        for event, student_id, staff_id, class_id in events:
+            fresh.apply(event, *person(student_id, staff_id), class_id)
+        for replayed in self.replay or ():
+            fresh.apply(*replayed)
+        self.rooms, self.locations, self.replay = fresh.rooms, fresh.locations, None
+
+
+def day_start():
+    return datetime.combine(datetime.utcnow().date(), time.min)
+
+
+async def rebuild_occupancy(db, occupancy):
+    # Run at startup and every OCCUPANCY_REFRESH_SECONDS, which is also how
+    # a worker learns of check-ins handled by the others. Each person's
+    # latest event today decides where they are; anyone still checked in at
+    # midnight is treated as gone.
+    latest = (
+        select(func.max(RoomEvent.id))
+        .filter(RoomEvent.at >= day_start())
+        .group_by(RoomEvent.student_id, RoomEvent.staff_id)
+    )
+    occupancy.start_rebuild()
+    try:
+        result = await db.execute(
+            select(RoomEvent.event, RoomEvent.student_id, RoomEvent.staff_id, RoomEvent.class_id).filter(RoomEvent.id.in_(latest))
+        )
+        occupancy.replace(result.all())
+    finally:
+        occupancy.replay = None
+
+
+async def record_room_event(db, class_id, event, student_id=None, staff_id=None):
+    # The row is the durable record; the counters follow once it commits.
+    row = RoomEvent(class_id=class_id, event=event, student_id=student_id, staff_id=staff_id, at=datetime.utcnow())
+    db.add(row)
+    await db.flush()
+    occupancy = db.info.get("occupancy")
+    if occupancy is not None:
+        kind, person_id = person(student_id, staff_id)
+        after_commit(db.sync_session, lambda: occupancy.apply(event, kind, person_id, class_id))
+    return row
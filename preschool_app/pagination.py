@@ -0,0 +1,57 @@
+import base64
+import binascii
+import json
+from typing import Optional
+from fastapi import HTTPException, Query, Request
+
+
+def encode_cursor(values):
+    raw = json.dumps(values, default=str, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    # Every list is keyed by an integer id; anything else would reach SQL
+    # as a bound parameter. bool is an int subclass, so it is refused too.
+    if not isinstance(values, list) or not values or not isinstance(values[0], int) or isinstance(values[0], bool):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+class PageParams:
+    # Page sizes come from the app's settings, so they are checked here
+    # rather than in the Query declaration.
+    def __init__(
+        self,
+        request: Request,
+        limit: Optional[int] = Query(None, ge=1, description="Defaults to DEFAULT_PAGE_SIZE, at most MAX_PAGE_SIZE"),
+        after: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    ):
+        settings = request.app.state.settings
+        if limit is not None and limit > settings.MAX_PAGE_SIZE:
+            raise HTTPException(status_code=422, detail=f"limit must be at most {settings.MAX_PAGE_SIZE}")
+        self.limit = limit or settings.DEFAULT_PAGE_SIZE
+        self.after = decode_cursor(after) if after else None
+
+
+def paginate(query, key_column, page):
+    # Keyset pagination: seek past the last key of the previous page
+    # instead of OFFSET, so every page is one index range scan. One extra
+    # row is fetched to tell whether another page follows.
+    if page.after is not None:
+        query = query.filter(key_column > page.after[0])
+    return query.order_by(key_column).limit(page.limit + 1)
+
+
+def make_page(items, page, key=lambda item: item.id):
+    items = list(items)
+    next_cursor = None
+    if len(items) > page.limit:
+        items = items[:page.limit]
+        next_cursor = encode_cursor([key(items[-1])])
+    return {"items": items, "next_cursor": next_cursor}
@@ -1,16 +1,35 @@
-from datetime import timedelta, datetime
-from fastapi import APIRouter, Request, status, Depends, HTTPException, Form
-from sqlalchemy.orm import Session, joinedload
-from preschool_app import starter, models, schemas
-from preschool_app.dependencies import get_db, get_current_user
+import asyncio
+from datetime import date, timedelta, datetime
+from fastapi import APIRouter, Request, status, Depends, HTTPException, Form, Query, WebSocket, WebSocketDisconnect
+from sqlalchemy.orm import aliased, load_only, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+from preschool_app import models, schemas
+from preschool_app.database import pool_status
+from preschool_app.dependencies import get_async_db, get_current_user, use_primary
+from preschool_app.pagination import PageParams, paginate, make_page
+from preschool_app.fieldsets import SparseFields
+from preschool_app.search import SEARCHABLE, search_terms, search_query
+from preschool_app.autocomplete import INDEXED, rebuild_name_index
+from preschool_app.bitmaps import absence_streaks, chronic_absence, co_presence, month_bitmaps, perfect_attendance
+from preschool_app.export import MEDIA_TYPES, attendance_export_query, stream_attendance
+from preschool_app.counters import class_count_column, enrollment_stats, join_class_counts, rebuild_enrollment_counts
+from preschool_app.attendance import attendance_rate, mark_student, month_start, next_month, record_roll_call
+from preschool_app.live import attendance_snapshot, live_day, next_event, wait_for_disconnect
+from preschool_app.occupancy import record_room_event
 from preschool_app.authorize import decode_token, create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
+from fastapi.responses import StreamingResponse
 from fastapi.security import OAuth2PasswordRequestForm
-from typing import Optional, List
-from preschool_app.models import Program, Class, Student, Admission, Role, Staff, Department
-from sqlalchemy import func
+from websockets.exceptions import ConnectionClosed
+from typing import Literal, Optional, List
+from preschool_app.models import Program, Class, Student, Admission, Role, Staff, Department, DailyActivity, Billing, Payment, StudentAttendanceMonth, ClassAttendanceDay, RoomEvent
+from sqlalchemy import and_, func, select
+from sqlalchemy.exc import IntegrityError
 
 preschool_router = APIRouter()
 
+student_fields = SparseFields(schemas.StudentResponse, Student)
+staff_fields = SparseFields(schemas.StaffResponse, Staff)
+
 
 def hash_password(password: str) -> str:
     salt = bcrypt.gensalt()
@@ -23,101 +42,220 @@ def hash_password(password: str) -> str:
 
 #     --   G E T   R E Q U E S T S   --
 
-@starter.get("/")
+@preschool_router.get("/")
 async def get_index():
     return {"message": "Welcome to Preschool API"}
 
-@starter.get("/about")
+@preschool_router.get("/about")
 async def get_index():
     return {"message": "Welcome to our About page! We are here to provide valuable information."}
 
-@starter.get("/contact")
+@preschool_router.get("/contact")
 async def get_index():
     return {"message": "Got questions or concerns? Feel free to contact us! Email: support@storytimepreschool.com"}
 
-@starter.get("/programs", response_model=List[schemas.ProgramResponse])
-async def get_programs(db: Session = Depends(get_db)):
-    programs = db.query(Program).all()
+@preschool_router.get("/search", response_model=List[schemas.SearchHit])
+async def search_names(
+    q: str = Query(..., min_length=2, max_length=100),
+    kind: Optional[List[str]] = Query(None, description="Limit hits to student, parent and/or staff"),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db)
+):
+    terms = search_terms(q)
+    if not terms:
+        raise HTTPException(status_code=400, detail="Search text must contain letters or digits")
+    kinds = set(kind or SEARCHABLE)
+    unknown = kinds - SEARCHABLE.keys()
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown kind: {', '.join(sorted(unknown))}")
+    rows = (await db.execute(search_query(db.get_bind().dialect.name, terms, kinds, limit))).all()
+    return [row._asdict() for row in rows]
+
+@preschool_router.get("/autocomplete", response_model=List[schemas.AutocompleteHit])
+async def autocomplete_names(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=100),
+    kind: Optional[List[str]] = Query(None, description="Limit hits to student, parent and/or staff"),
+    limit: int = Query(10, ge=1, le=50)
+):
+    kinds = set(kind) if kind else None
+    if kinds and kinds - INDEXED.keys():
+        raise HTTPException(status_code=400, detail=f"Unknown kind: {', '.join(sorted(kinds - INDEXED.keys()))}")
+    return request.app.state.name_index.lookup(q, limit, kinds)
+
+@preschool_router.get("/programs", response_model=schemas.Page[schemas.ProgramResponse])
+async def get_programs(page: PageParams = Depends(), db: AsyncSession = Depends(get_async_db)):
+    programs = (await db.scalars(paginate(select(Program), Program.id, page))).all()
     if not programs:
         raise HTTPException(status_code=404, detail="Programs not available!")
-    return programs
+    return make_page(programs, page)
 
-@starter.get("/programs/program_id", response_model = schemas.ProgramResponse)
-async def get_program_by_id(program_id: int, db: Session = Depends(get_db)):
-    program = db.query(Program).filter(Program.id == program_id).first()
+@preschool_router.get("/programs/program_id", response_model = schemas.ProgramResponse)
+async def get_program_by_id(program_id: int, db: AsyncSession = Depends(get_async_db)):
+    program = await db.scalar(select(Program).filter(Program.id == program_id))
     if not program:
         raise HTTPException(status_code=404, detail="Program not available!")
     return program
 
-@starter.get("/classes", response_model=List[schemas.ClassResponse])
-async def get_classes(db: Session = Depends(get_db)):
-    classes = db.query(Class).options(joinedload(Class.program)).all()
-    if not classes:
-        raise HTTPException(status_code=404, detail="Classes not available!")
-    result = []
-    for class_deets in classes:
-        program_data = db.query(Program).filter(Program.id == class_deets.program_id).all()
-        class_info = {
-            "id": class_deets.id,
-            "name": class_deets.name, 
-            "program": [program.name for program in program_data]
-        }
-        result.append(class_info)
-    return result
-
+def class_listing_query():
+    class_teacher = aliased(models.Teacher)
+    class_teacher_staff = aliased(Staff)
+    assistant_teacher = aliased(models.Teacher)
+    assistant_teacher_staff = aliased(Staff)
+    query = (
+        select(
+            Class.id,
+            Class.name,
+            Program.name.label("program"),
+            class_teacher_staff.name.label("class_teacher"),
+            assistant_teacher_staff.name.label("assistant_teacher"),
+            class_count_column().label("student_count"),
+        )
+        .outerjoin(Program, Program.id == Class.program_id)
+        .outerjoin(class_teacher, class_teacher.id == Class.class_teacher_id)
+        .outerjoin(class_teacher_staff, class_teacher_staff.id == class_teacher.staff_id)
+        .outerjoin(assistant_teacher, assistant_teacher.id == Class.assistant_teacher_id)
+        .outerjoin(assistant_teacher_staff, assistant_teacher_staff.id == assistant_teacher.staff_id)
+    )
+    # Maintained counters instead of counting the student table per listing.
+    return join_class_counts(query)
+
+def convert_class_row_to_response(row):
+    return {
+        "id": row.id,
+        "name": row.name,
+        "program": [row.program] if row.program is not None else [],
+        "class_teacher": row.class_teacher,
+        "assistant_teacher": row.assistant_teacher,
+        "student_count": row.student_count,
+    }
 
+@preschool_router.get("/classes", response_model=schemas.Page[schemas.ClassResponse])
+async def get_classes(page: PageParams = Depends(), db: AsyncSession = Depends(get_async_db)):
+    rows = (await db.execute(paginate(class_listing_query(), Class.id, page))).all()
+    if not rows:
+        raise HTTPException(status_code=404, detail="Classes not available!")
+    return make_page([convert_class_row_to_response(row) for row in rows], page, key=lambda item: item["id"])
 
-@starter.get("/classes/class_id", response_model=schemas.ClassResponse)
-async def get_class_by_id(class_id: int, db: Session = Depends(get_db)):
-    student_class = db.query(Class).filter(Class.id == class_id).first()
-    if not student_class:
+@preschool_router.get("/classes/class_id", response_model=schemas.ClassResponse)
+async def get_class_by_id(class_id: int, db: AsyncSession = Depends(get_async_db)):
+    row = (await db.execute(class_listing_query().filter(Class.id == class_id))).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Class not available!")
-    program_data = db.query(Program).filter(Program.id == student_class.program_id).all()
-    class_info = {
-        "id": student_class.id,
-        "name": student_class.name,
-        "program": [program.name for program in program_data],
-    }
-    return class_info
+    return convert_class_row_to_response(row)
 
-@starter.get("/students", response_model=List[schemas.StudentResponse])
-async def get_students(db: Session = Depends(get_db)):
-    students = db.query(Student).all()
+@preschool_router.get("/students", response_model=schemas.Page[schemas.SparseStudentResponse], response_model_exclude_unset=True)
+async def get_students(
+    page: PageParams = Depends(),
+    fields: Optional[list] = Depends(student_fields),
+    db: AsyncSession = Depends(get_async_db)
+):
+    if fields:
+        rows = (await db.execute(paginate(select(*fields), Student.id, page))).all()
+        students = [row._asdict() for row in rows]
+    else:
+        query = select(Student).options(load_only(*student_fields.columns), selectinload(Student.medical_conditions))
+        students = (await db.scalars(paginate(query, Student.id, page))).all()
     if not students:
         raise HTTPException(status_code=404, detail="Students not available!")
-    return students
+    return make_page(students, page, key=lambda item: item["id"] if fields else item.id)
+
+def student_search_filters(class_id, min_age, max_age, gender_id, is_disable, medical_condition_id):
+    filters = []
+    if class_id is not None:
+        filters.append(Student.class_id == class_id)
+    if min_age is not None:
+        filters.append(Student.age >= min_age)
+    if max_age is not None:
+        filters.append(Student.age <= max_age)
+    if gender_id is not None:
+        filters.append(Student.gender_id == gender_id)
+    if is_disable is not None:
+        filters.append(Student.is_disable == is_disable)
+    if medical_condition_id is not None:
+        association = models.StudentMedicalConditionAssociation
+        filters.append(
+            select(association.student_id)
+            .filter(association.student_id == Student.id, association.medical_condition_id == medical_condition_id)
+            .exists()
+        )
+    return filters
+
+@preschool_router.get("/students/search", response_model=schemas.StudentSearchPage, response_model_exclude_unset=True)
+async def search_students(
+    class_id: Optional[int] = None,
+    min_age: Optional[int] = Query(None, ge=0),
+    max_age: Optional[int] = Query(None, ge=0),
+    gender_id: Optional[int] = None,
+    is_disable: Optional[bool] = None,
+    medical_condition_id: Optional[int] = None,
+    page: PageParams = Depends(),
+    fields: Optional[list] = Depends(student_fields),
+    db: AsyncSession = Depends(get_async_db)
+):
+    filters = student_search_filters(class_id, min_age, max_age, gender_id, is_disable, medical_condition_id)
+    total = await db.scalar(select(func.count(Student.id)).filter(*filters))
+    if fields:
+        rows = (await db.execute(paginate(select(*fields).filter(*filters), Student.id, page))).all()
+        students = [row._asdict() for row in rows]
+    else:
+        query = select(Student).options(load_only(*student_fields.columns), selectinload(Student.medical_conditions)).filter(*filters)
+        students = (await db.scalars(paginate(query, Student.id, page))).all()
+    result = make_page(students, page, key=lambda item: item["id"] if fields else item.id)
+    result["total"] = total
+    return result
 
-@starter.get("/students/student_id", response_model=List[schemas.StudentResponse])
-async def get_student_by_id(student_id: int, db: Session = Depends(get_db)):
-    student = db.query(Student).filter(Student.id == student_id).first()
+@preschool_router.get("/students/student_id", response_model=List[schemas.StudentResponse])
+async def get_student_by_id(student_id: int, db: AsyncSession = Depends(get_async_db)):
+    student = await db.scalar(select(Student).options(selectinload(Student.medical_conditions)).filter(Student.id == student_id))
     if not student:
         raise HTTPException(status_code=404, detail="Student not available!")
     return student
 
-@starter.get("/staff-members", response_model=List[schemas.StaffResponse])
-async def get_staff_members(db: Session = Depends(get_db)):
-    staff = db.query(Staff).all()
+@preschool_router.get("/staff-members", response_model=schemas.Page[schemas.SparseStaffResponse], response_model_exclude_unset=True)
+async def get_staff_members(
+    page: PageParams = Depends(),
+    fields: Optional[list] = Depends(staff_fields),
+    db: AsyncSession = Depends(get_async_db)
+):
+    if fields:
+        rows = (await db.execute(paginate(select(*fields), Staff.id, page))).all()
+        staff = [row._asdict() for row in rows]
+    else:
+        query = select(Staff).options(load_only(*staff_fields.columns), selectinload(Staff.schedule))
+        staff = (await db.scalars(paginate(query, Staff.id, page))).all()
     if not staff :
         raise HTTPException(status_code=404, detail="Staff not available!")
-    return staff
+    return make_page(staff, page, key=lambda item: item["id"] if fields else item.id)
 
 
-@starter.get("/staff/members/staff_id", response_model=schemas.StaffResponse)
-async def get_staff_member_by_id(staff_id: int, db: Session = Depends(get_db)):
-    staff_member = db.query(Staff).filter(Staff.id == staff_id).first()
+@preschool_router.get("/staff/members/staff_id", response_model=schemas.StaffResponse)
+async def get_staff_member_by_id(staff_id: int, db: AsyncSession = Depends(get_async_db)):
+    staff_member = await db.scalar(select(Staff).options(selectinload(Staff.schedule)).filter(Staff.id == staff_id))
     if not staff_member:
         raise HTTPException(status_code=404, detail="Staff not available!")
     return staff_member
 
+def department_staff_count_query():
+    staff_counts = (
+        select(Staff.department_id, func.count(Staff.id).label("staff_members"))
+        .group_by(Staff.department_id)
+        .subquery()
+    )
+    return (
+        select(Department.id, Department.name, func.coalesce(staff_counts.c.staff_members, 0).label("staff_members"))
+        .outerjoin(staff_counts, staff_counts.c.department_id == Department.id)
+    )
+
 def convert_department_to_response(department):
     return [
-        schemas.DepartmentResponse(id=dept.id, name=dept.name, staff_members=len(dept.staff_members))
+        schemas.DepartmentResponse(id=dept.id, name=dept.name, staff_members=dept.staff_members)
         for dept in department
     ]
 
-@starter.get("/departments", response_model=List[schemas.DepartmentResponse])
-async def get_departments(db: Session = Depends(get_db)):
-    department = db.query(Department).all()
+@preschool_router.get("/departments", response_model=List[schemas.DepartmentResponse])
+async def get_departments(db: AsyncSession = Depends(get_async_db)):
+    department = (await db.execute(department_staff_count_query().order_by(Department.id))).all()
     if not department:
         raise HTTPException(status_code=404, detail="Departments not available!")
 
@@ -126,200 +264,423 @@ async def get_departments(db: Session = Depends(get_db)):
     return department_response_list
 
 
-@starter.get("/departments/department_id", response_model = schemas.DepartmentResponse)
-async def get_department_by_id(department_id: int, db: Session = Depends(get_db)):
-    department = db.query(Department).filter(Department.id == department_id).first()
+@preschool_router.get("/departments/department_id", response_model = schemas.DepartmentResponse)
+async def get_department_by_id(department_id: int, db: AsyncSession = Depends(get_async_db)):
+    department = (await db.execute(department_staff_count_query().filter(Department.id == department_id))).first()
     if not department:
         raise HTTPException(status_code=404, detail="Department not available!")
-    return department
-
-@starter.get("/roles", response_model=List[schemas.RoleResponse])
-async def get_roles(db: Session = Depends(get_db)):
-    roles = db.query(Role).all()  
-    if not roles:
+    return convert_department_to_response([department])[0]
+
+def role_staff_query(staff_limit, staff_offset):
+    ranked_staff = select(
+        Staff.id,
+        Staff.name,
+        Staff.role_id,
+        func.row_number().over(partition_by=Staff.role_id, order_by=Staff.id).label("position"),
+    ).subquery()
+    staff_totals = (
+        select(Staff.role_id, func.count(Staff.id).label("staff_total"))
+        .group_by(Staff.role_id)
+        .subquery()
+    )
+    return (
+        select(
+            Role.id,
+            Role.name,
+            ranked_staff.c.id.label("staff_id"),
+            ranked_staff.c.name.label("staff_name"),
+            func.coalesce(staff_totals.c.staff_total, 0).label("staff_total"),
+        )
+        .outerjoin(ranked_staff, and_(
+            ranked_staff.c.role_id == Role.id,
+            ranked_staff.c.position > staff_offset,
+            ranked_staff.c.position <= staff_offset + staff_limit,
+        ))
+        .outerjoin(staff_totals, staff_totals.c.role_id == Role.id)
+        .order_by(Role.id, ranked_staff.c.position)
+    )
+
+def convert_role_rows_to_response(rows):
+    roles = {}
+    for row in rows:
+        role = roles.setdefault(row.id, {"id": row.id, "name": row.name, "staff": [], "staff_total": row.staff_total})
+        if row.staff_id is not None:
+            role["staff"].append({"id": row.staff_id, "name": row.staff_name})
+    return list(roles.values())
+
+@preschool_router.get("/roles", response_model=List[schemas.RoleResponse])
+async def get_roles(
+    staff_limit: int = Query(50, ge=1, le=500),
+    staff_offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_async_db)
+):
+    rows = (await db.execute(role_staff_query(staff_limit, staff_offset))).all()
+    if not rows:
         raise HTTPException(status_code=404, detail="Roles not available!")
-    result = []
-    for role in roles:
-        staff_data = db.query(Staff).filter(Staff.role_id == role.id).all()
-        role_info = {
-            "id": role.id,
-            "name": role.name,
-            "staff": [staff.name for staff in staff_data]
-        }
-        result.append(role_info)
-    return result
-
-@starter.get("/roles/role_id", response_model=List[schemas.RoleResponse])
-async def get_role_by_id(role_id: int, db: Session = Depends(get_db)):
-    role = db.query(Role).filter(Role.id == role_id).first()  
-    if not role:
+    return convert_role_rows_to_response(rows)
+
+@preschool_router.get("/roles/role_id", response_model=List[schemas.RoleResponse])
+async def get_role_by_id(
+    role_id: int,
+    staff_limit: int = Query(50, ge=1, le=500),
+    staff_offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_async_db)
+):
+    rows = (await db.execute(role_staff_query(staff_limit, staff_offset).filter(Role.id == role_id))).all()
+    if not rows:
         raise HTTPException(status_code=404, detail="Role not available!")
-    result = []
-    staff_data = db.query(Staff).filter(Staff.role_id == role.id).all()
-    role_info = {
-        "id": role.id,
-        "name": role.name,
-        "staff": [staff.name for staff in staff_data]
-    }
-    result.append(role_info)
-    return result
+    return convert_role_rows_to_response(rows)
 
 
 
-@starter.get("/medical/categories", response_model=List[schemas.MedicalCategoryResponse])
-async def get_medical_categories(db: Session = Depends(get_db)):
-    categories = db.query(models.MedicalCategory).all()
-    return categories
+@preschool_router.get("/medical/categories", response_model=schemas.Page[schemas.MedicalCategoryResponse])
+async def get_medical_categories(page: PageParams = Depends(), db: AsyncSession = Depends(get_async_db)):
+    categories = (await db.scalars(paginate(select(models.MedicalCategory), models.MedicalCategory.id, page))).all()
+    return make_page(categories, page)
 
-@starter.get("/medical/category/{category_id}", response_model=List[schemas.MedicalConditionResponse])
-async def get_conditions_by_category(category_id: int, db: Session = Depends(get_db)):
-    conditions = db.query(models.MedicalCondition).filter(models.MedicalCondition.medical_category_id == category_id).all()
+@preschool_router.get("/medical/category/{category_id}", response_model=List[schemas.MedicalConditionResponse])
+async def get_conditions_by_category(category_id: int, db: AsyncSession = Depends(get_async_db)):
+    conditions = (await db.scalars(select(models.MedicalCondition).filter(models.MedicalCondition.medical_category_id == category_id))).all()
     return conditions
 
 
-@starter.get("/medical/{medical_id}", response_model=schemas.MedicalConditionResponse)
-async def get_medical_condition_by_id(medical_id: int, db: Session = Depends(get_db)):
-    medical_condition = db.query(models.MedicalCondition).filter(models.MedicalCondition.id == medical_id).first()
+@preschool_router.get("/medical/{medical_id}", response_model=schemas.MedicalConditionResponse)
+async def get_medical_condition_by_id(medical_id: int, db: AsyncSession = Depends(get_async_db)):
+    medical_condition = await db.scalar(select(models.MedicalCondition).filter(models.MedicalCondition.id == medical_id))
     if not medical_condition:
         raise HTTPException(status_code=404, detail="Medical condition not found")
     return medical_condition
 
-@starter.get("/student/{student_id}/medical-conditions", response_model=List[schemas.MedicalConditionResponse])
-async def get_student_medical_conditions(student_id: int, db: Session = Depends(get_db)):
-    student = db.query(models.Student).filter(models.Student.id == student_id).first()
+@preschool_router.get("/student/{student_id}/medical-conditions", response_model=List[schemas.MedicalConditionResponse])
+async def get_student_medical_conditions(student_id: int, db: AsyncSession = Depends(get_async_db)):
+    student = await db.scalar(select(models.Student).options(selectinload(models.Student.medical_conditions)).filter(models.Student.id == student_id))
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
 
     return student.medical_conditions
 
 
-@starter.get("/daily-activities", response_model=List[schemas.DailyActivityResponse])
+@preschool_router.get("/daily-activities", response_model=schemas.Page[schemas.DailyActivityResponse])
 async def get_daily_activities(
     student_id: int,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
-    db: Session = Depends(get_db)
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    student = db.query(Student).filter(Student.id == student_id).first()
+    student = await db.scalar(select(Student).filter(Student.id == student_id))
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
 
-    query = session.query(DailyActivity).filter(DailyActivity.student_id == student_id)
+    query = select(DailyActivity).filter(DailyActivity.student_id == student_id)
 
     if start_date:
         query = query.filter(DailyActivity.date >= start_date)
     if end_date:
         query = query.filter(DailyActivity.date <= end_date)
 
-    activities = query.all()
+    activities = (await db.scalars(paginate(query, DailyActivity.id, page))).all()
 
     if not activities:
         raise HTTPException(status_code=404, detail="No daily activities found")
 
-    return activities
+    return make_page(activities, page)
+
+@preschool_router.get("/attendance/export")
+async def export_attendance(
+    request: Request,
+    day_from: date = Query(..., alias="from"),
+    day_to: date = Query(..., alias="to"),
+    class_id: Optional[int] = None,
+    format: Literal["csv", "ndjson"] = "csv"
+):
+    if day_from > day_to:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+
+    query = attendance_export_query(day_from, day_to, class_id)
+    filename = f"attendance_{day_from.isoformat()}_{day_to.isoformat()}.{format}"
+    return StreamingResponse(
+        stream_attendance(request.app.state.database, query, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+# Analytics over the per-month attendance bitmaps: each answer is bitwise
+# work over one small row per student rather than a self-join.
+
+@preschool_router.get("/analytics/attendance/perfect", response_model=schemas.PerfectAttendance)
+async def get_perfect_attendance(
+    month: date = Query(..., description="Any day in the month"),
+    class_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    month = month_start(month)
+    days, students = perfect_attendance(await month_bitmaps(db, month, class_id))
+    return {"month": month, "school_days": days, "students": students}
+
+@preschool_router.get("/analytics/attendance/absence-streaks", response_model=List[schemas.AbsenceStreak])
+async def get_absence_streaks(
+    month: date = Query(..., description="Any day in the month"),
+    min_days: int = Query(3, ge=1, le=31),
+    class_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    return absence_streaks(await month_bitmaps(db, month_start(month), class_id), min_days)
+
+@preschool_router.get("/analytics/attendance/chronic-absence", response_model=List[schemas.ChronicAbsence])
+async def get_chronic_absence(
+    month: date = Query(..., description="Any day in the month"),
+    threshold: float = Query(0.1, gt=0, le=1, description="Share of marked days absent"),
+    class_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    return chronic_absence(await month_bitmaps(db, month_start(month), class_id), threshold)
+
+@preschool_router.get("/analytics/attendance/co-presence", response_model=List[schemas.CoPresence])
+async def get_co_presence(
+    student_id: int,
+    month: date = Query(..., description="Any day in the month"),
+    class_id: Optional[int] = None,
+    limit: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db)
+):
+    return co_presence(await month_bitmaps(db, month_start(month), class_id), student_id, limit)
+
+@preschool_router.get("/stats/enrollment", response_model=schemas.EnrollmentStats)
+async def get_enrollment_stats(db: AsyncSession = Depends(get_async_db)):
+    return await enrollment_stats(db)
+
+def rollup_response(row, **keys):
+    return dict(keys, present=row.present, absent=row.absent, rate=attendance_rate(row.present, row.absent))
+
+@preschool_router.get("/students/{student_id}/attendance/monthly", response_model=List[schemas.StudentAttendanceMonthResponse])
+async def get_student_monthly_attendance(student_id: int, db: AsyncSession = Depends(use_primary)):
+    months = (await db.scalars(
+        select(StudentAttendanceMonth).filter(StudentAttendanceMonth.student_id == student_id).order_by(StudentAttendanceMonth.month)
+    )).all()
+    if not months:
+        raise HTTPException(status_code=404, detail="No attendance recorded for this student")
+
+    return [rollup_response(row, student_id=row.student_id, month=row.month) for row in months]
+
+@preschool_router.get("/classes/{class_id}/attendance/monthly", response_model=schemas.ClassAttendanceMonthResponse)
+async def get_class_monthly_attendance(
+    class_id: int,
+    month: date = Query(..., description="Any day in the month"),
+    db: AsyncSession = Depends(use_primary)
+):
+    # Reads the rollups only: one row per school day and one per student.
+    month = month_start(month)
+    days = (await db.scalars(
+        select(ClassAttendanceDay)
+        .filter(ClassAttendanceDay.class_id == class_id, ClassAttendanceDay.attendance_day >= month, ClassAttendanceDay.attendance_day < next_month(month))
+        .order_by(ClassAttendanceDay.attendance_day)
+    )).all()
+    students = (await db.scalars(
+        select(StudentAttendanceMonth)
+        .join(Student, Student.id == StudentAttendanceMonth.student_id)
+        .filter(Student.class_id == class_id, StudentAttendanceMonth.month == month)
+        .order_by(StudentAttendanceMonth.student_id)
+    )).all()
+    if not days and not students:
+        raise HTTPException(status_code=404, detail="No attendance recorded for this class and month")
+
+    present = sum(row.present for row in days)
+    absent = sum(row.absent for row in days)
+    return {
+        "class_id": class_id,
+        "month": month,
+        "present": present,
+        "absent": absent,
+        "rate": attendance_rate(present, absent),
+        "days": [rollup_response(row, attendance_day=row.attendance_day) for row in days],
+        "students": [rollup_response(row, student_id=row.student_id, month=row.month) for row in students],
+    }
+
+@preschool_router.websocket("/live/attendance")
+async def live_attendance(websocket: WebSocket):
+    # Today's per-class counts, then one message per committed attendance
+    # write. Subscribing before the snapshot is read means no write that
+    # commits in between is missed; a duplicate is harmless since every
+    # message carries absolute counts.
+    await websocket.accept()
+    broadcaster = websocket.app.state.broadcaster
+    queue = broadcaster.subscribe()
+    disconnected = asyncio.ensure_future(wait_for_disconnect(websocket))
+    try:
+        async with websocket.app.state.database.async_sessions() as db:
+            await websocket.send_json(await attendance_snapshot(db, live_day()))
+        while (event := await next_event(queue, disconnected)) is not None:
+            await websocket.send_json(event)
+        if not disconnected.done():
+            await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+    except (WebSocketDisconnect, ConnectionClosed, RuntimeError):
+        # A send racing the client going away: the server raises
+        # ConnectionClosed, or RuntimeError once the close was recorded.
+        pass
+    finally:
+        disconnected.cancel()
+        broadcaster.unsubscribe(queue)
+
+@preschool_router.get("/occupancy", response_model=List[schemas.RoomOccupancy])
+async def get_occupancy(request: Request):
+    # Served from this worker's counters; see occupancy.py.
+    return request.app.state.occupancy.occupied()
+
+@preschool_router.get("/classes/{class_id}/occupancy", response_model=schemas.RoomOccupancy)
+async def get_class_occupancy(class_id: int, request: Request):
+    return request.app.state.occupancy.room(class_id)
+
+@preschool_router.get("/students/{student_id}/room-events", response_model=List[schemas.RoomEventResponse])
+async def get_student_room_events(
+    student_id: int,
+    day: Optional[date] = Query(None, description="Defaults to today"),
+    db: AsyncSession = Depends(use_primary)
+):
+    # Arrival and pickup times for one day.
+    start = datetime.combine(day or datetime.utcnow().date(), datetime.min.time())
+    return (await db.scalars(
+        select(RoomEvent)
+        .filter(RoomEvent.student_id == student_id, RoomEvent.at >= start, RoomEvent.at < start + timedelta(days=1))
+        .order_by(RoomEvent.at, RoomEvent.id)
+    )).all()
 
 
 
 
 #     --   C R E A T E   R E Q U E S T S   --
 
-@starter.post("/admission", response_model = schemas.AdmissionResponse)
-async def create_admission(student_id: int, program_id: int):
+@preschool_router.post("/admission", response_model = schemas.AdmissionResponse)
+async def create_admission(student_id: int, program_id: int, db: AsyncSession = Depends(get_async_db)):
     new_admission = Admission(student_id=student_id, program_id=program_id)
     new_admission.generate_student_number()
 
     if student_id and program_id:
-        session.add(new_admission)
-        session.commit()
+        db.add(new_admission)
+        await db.flush()
+        await db.refresh(new_admission)
         return new_admission
     else:
         raise HTTPException(status_code=400, detail="Invalid input")
 
 
-@starter.post("/program", response_model=schemas.ProgramRequest)
-async def create_new_program(Name: str, Description:str, db: Session = Depends(get_db)):
-    available_program = db.query(models.Program).filter(func.lower(models.Program.name) == func.lower(Name)).first()
-    if available_program:
-        raise HTTPException(status_code=400, detail="This program already exists")
+async def add_unique(db, instance, detail):
+    # Relies on the unique name_key index; the savepoint keeps a conflict
+    # from rolling back the rest of the request.
+    try:
+        async with db.begin_nested():
+            db.add(instance)
+    except IntegrityError:
+        raise HTTPException(status_code=400, detail=detail)
+
+@preschool_router.post("/program", response_model=schemas.ProgramRequest)
+async def create_new_program(Name: str, Description:str, db: AsyncSession = Depends(get_async_db)):
     db_program = models.Program(name=Name, description=Description)
     if Name and Description:
-        db.add(db_program)
-        db.commit()
-        db.refresh(db_program)
+        await add_unique(db, db_program, "This program already exists")
+        await db.flush()
+        await db.refresh(db_program)
         return db_program
     else:
         raise HTTPException(status_code=400, detail="Invalid input")
 
-@starter.post("/class", response_model=schemas.ClassRequest)
-async def create_new_class(Name: str, program_id: int, db: Session = Depends(get_db)):
-    available_class = db.query(models.Class).filter(func.lower(models.Class.name) == func.lower(Name)).first()
-    if available_class:
-        raise HTTPException(status_code=400, detail="This class already exists")
-
-    available_program = db.query(models.Program).filter(models.Program.id == program_id).first()
+@preschool_router.post("/class", response_model=schemas.ClassRequest)
+async def create_new_class(Name: str, program_id: int, db: AsyncSession = Depends(get_async_db)):
+    available_program = await db.scalar(select(models.Program).filter(models.Program.id == program_id))
     if not available_program:
         raise HTTPException(status_code=400, detail="Program with this ID does not exist")
 
     db_class = models.Class(name = Name, program_id = program_id)
     if Name:
-        db.add(db_class)
-        db.commit()
-        db.refresh(db_class)
+        await add_unique(db, db_class, "This class already exists")
+        await db.flush()
+        await db.refresh(db_class)
         return db_class
     else:
         raise HTTPException(status_code=400, detail="Invalid input")
 
 
 
-@starter.post("/gender", response_model=schemas.GenderRequest)
-async def create_new_gender(Name: str, db: Session = Depends(get_db)):
-    available_gender = db.query(models.Gender).filter(func.lower(models.Gender.name) == func.lower(Name)).first()
-    if available_gender:
-        raise HTTPException(status_code=400, detail="Gender already exists")
-    
+@preschool_router.post("/gender", response_model=schemas.GenderRequest)
+async def create_new_gender(Name: str, db: AsyncSession = Depends(get_async_db)):
     db_gender = models.Gender(name = Name)
 
     if Name:
-        db.add(db_gender)
-        db.commit()
-        db.refresh(db_gender)
+        await add_unique(db, db_gender, "Gender already exists")
+        await db.flush()
+        await db.refresh(db_gender)
         return db_gender
     else:
         raise HTTPException(status_code=400, detail="Invalid input")
 
 
-@starter.post("/attendance", response_model=schemas.AttendanceResponse)
-async def mark_attendance(attendance_data: schemas.AttendanceCreate, db: Session = Depends(get_db)):
-    student = db.query(models.Student).filter(models.Student.id == attendance_data.student_id).first()
+@preschool_router.post("/attendance", response_model=schemas.AttendanceResponse)
+async def mark_attendance(attendance_data: schemas.AttendanceCreate, db: AsyncSession = Depends(get_async_db)):
+    student = await db.scalar(select(models.Student).filter(models.Student.id == attendance_data.student_id))
+    if not student:
+        raise HTTPException(status_code=404, detail="Student not found")
+
+    # Marking the same student twice in a day updates the day's row.
+    marked_at = attendance_data.date or datetime.utcnow()
+    return await mark_student(db, student, attendance_data.status, marked_at)
+
+@preschool_router.post("/classes/{class_id}/attendance", response_model=schemas.RollCallResponse)
+async def mark_class_attendance(class_id: int, roll_call: schemas.RollCallRequest, db: AsyncSession = Depends(get_async_db)):
+    if not await db.scalar(select(Class.id).filter(Class.id == class_id)):
+        raise HTTPException(status_code=404, detail="Class not found")
+
+    if len({entry.student_id for entry in roll_call.entries}) != len(roll_call.entries):
+        raise HTTPException(status_code=400, detail="Each student can only be marked once")
+
+    results = await record_roll_call(db, class_id, roll_call.date, roll_call.entries)
+
+    return {"class_id": class_id, "date": roll_call.date, "results": results}
+
+async def room_event(db, class_id, event, person):
+    if (person.student_id is None) == (person.staff_id is None):
+        raise HTTPException(status_code=400, detail="Give exactly one of student_id and staff_id")
+
+    if not await db.scalar(select(Class.id).filter(Class.id == class_id)):
+        raise HTTPException(status_code=404, detail="Class not found")
+
+    if person.staff_id is not None:
+        if not await db.scalar(select(Staff.id).filter(Staff.id == person.staff_id)):
+            raise HTTPException(status_code=404, detail="Staff not found")
+        return await record_room_event(db, class_id, event, staff_id=person.staff_id)
+
+    student = await db.scalar(select(Student).filter(Student.id == person.student_id))
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
 
-    total_students = db.query(models.Student).count()
-    if total_students == 0:
-        raise HTTPException(status_code=404, detail="There are no students at the moment")
+    row = await record_room_event(db, class_id, event, student_id=student.id)
+    if event == "in":
+        # Arriving is also the day's attendance mark.
+        await mark_student(db, student, "present", row.at)
+    return row
 
-    new_attendance = models.Attendance(student_id=student_id, status=status)
-    db.add(new_attendance)
-    db.commit()
-    db.refresh(new_attendance)
+@preschool_router.post("/classes/{class_id}/check-in", response_model=schemas.RoomEventResponse)
+async def check_in(class_id: int, person: schemas.RoomEventRequest, db: AsyncSession = Depends(get_async_db)):
+    return await room_event(db, class_id, "in", person)
 
-    return new_attendance
+@preschool_router.post("/classes/{class_id}/check-out", response_model=schemas.RoomEventResponse)
+async def check_out(class_id: int, person: schemas.RoomEventRequest, db: AsyncSession = Depends(get_async_db)):
+    return await room_event(db, class_id, "out", person)
 
 
-@starter.post("/student/{student_id}/medical-condition/{condition_id}", response_model=schemas.StudentMedicalConditionAssociationResponse)
-async def associate_medical_condition(student_id: int, condition_id: int, db: Session = Depends(get_db)):
-    student = db.query(models.Student).filter(models.Student.id == student_id).first()
+@preschool_router.post("/student/{student_id}/medical-condition/{condition_id}", response_model=schemas.StudentMedicalConditionAssociationResponse)
+async def associate_medical_condition(student_id: int, condition_id: int, db: AsyncSession = Depends(get_async_db)):
+    student = await db.scalar(select(models.Student).filter(models.Student.id == student_id))
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
 
-    condition = db.query(models.MedicalCondition).filter(models.MedicalCondition.id == condition_id).first()
+    condition = await db.scalar(select(models.MedicalCondition).filter(models.MedicalCondition.id == condition_id))
     if not condition:
         raise HTTPException(status_code=404, detail="Medical condition not found")
 
     association = models.StudentMedicalConditionAssociation(student_id=student_id, medical_condition_id=condition_id)
     db.add(association)
-    db.commit()
-    db.refresh(association)
+    await db.flush()
+    await db.refresh(association)
 
     return association
 
@@ -336,75 +697,92 @@ def get_current_user_role(current_user: schemas.StaffResponse = Depends(get_curr
 
 
 #     --   G E T   R E Q U E S T S   --
-@starter.get("/staff/schedule/{staff_id}", response_model=schemas.ScheduleResponse)
-async def get_staff_schedule(staff_id: int, db: Session = Depends(get_db)):
-    staff = db.query(models.Staff).filter(models.Staff.id == staff_id).first()
+@preschool_router.get("/staff/schedule/{staff_id}", response_model=schemas.ScheduleResponse)
+async def get_staff_schedule(staff_id: int, db: AsyncSession = Depends(get_async_db)):
+    staff = await db.scalar(select(models.Staff).options(selectinload(models.Staff.schedule)).filter(models.Staff.id == staff_id))
     if not staff:
         raise HTTPException(status_code=404, detail="Staff not found")
     return staff.schedule
 
+@staff_router.get("/admin/pool", response_model=schemas.PoolMetricsResponse)
+async def get_pool_metrics(request: Request, current_user: schemas.StaffResponse = Depends(get_current_user)):
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="You do not have the permission to view pool metrics")
+    engines = request.app.state.database.built_engines()
+    return {"engines": {label: pool_status(engine) for label, engine in engines.items()}}
+
 
 
     #     --   P O S T   R E Q U E S T S   --
 
 
+@staff_router.post("/admin/autocomplete/rebuild", response_model=schemas.NameIndexStatus)
+async def rebuild_autocomplete(request: Request, current_user: schemas.StaffResponse = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="You do not have the permission to rebuild the name index")
+    name_index = request.app.state.name_index
+    await rebuild_name_index(db, name_index)
+    return {"entries": len(name_index), "truncated": name_index.truncated}
+
+@staff_router.post("/admin/stats/rebuild", response_model=schemas.EnrollmentStats)
+async def rebuild_enrollment_stats(current_user: schemas.StaffResponse = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="You do not have the permission to rebuild enrollment counters")
+    for statement in rebuild_enrollment_counts():
+        await db.execute(statement)
+    return await enrollment_stats(db)
+
 @staff_router.post("/staff/register", response_model=schemas.StaffCreate)
-async def register_staff(staff: schemas.StaffCreate, db: Session = Depends(get_db)):
-    existing_staff = db.query(models.Staff).filter(models.Staff.email == staff_data.email).first()
+async def register_staff(staff_data: schemas.StaffCreate, db: AsyncSession = Depends(get_async_db)):
+    existing_staff = await db.scalar(select(models.Staff).filter(models.Staff.email == staff_data.email))
     if existing_staff:
         raise HTTPException(status_code=400, detail="Staff with this email already registered")
 
     new_staff = models.Staff(**staff_data.dict())
     db.add(new_staff)
-    db.commit()
-    db.refresh(new_staff)
+    await db.flush()
+    await db.refresh(new_staff)
 
     return new_staff
 
 @staff_router.post("/staff/login", response_model=schemas.Token)
-async def login_staff(staff_data: schemas.StaffLogin, db: Session = Depends(get_db)):
-    staff = db.query(models.Staff).filter(models.Staff.email == staff_data.email).first()
+async def login_staff(request: Request, staff_data: schemas.StaffLogin, db: AsyncSession = Depends(get_async_db)):
+    staff = await db.scalar(select(models.Staff).filter(models.Staff.email == staff_data.email))
     if not staff or not staff.verify_password(staff_data.password):
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
-    access_token = create_access_token({"sub": staff.email, "role": staff.role})
+    access_token = create_access_token({"sub": staff.email, "role": staff.role}, request.app.state.settings.SECRET_KEY)
 
     return {"access_token": access_token, "token_type": "bearer"}
 
 @staff_router.post("/schedule", response_model=schemas.ScheduleResponse)
-async def create_staff_schedule(schedule: schemas.ScheduleCreate, db: Session = Depends(get_db)):
+async def create_staff_schedule(schedule: schemas.ScheduleCreate, db: AsyncSession = Depends(get_async_db)):
     db_schedule = models.Schedule(**schedule.dict())
     db.add(db_schedule)
-    db.commit()
-    db.refresh(db_schedule)
+    await db.flush()
+    await db.refresh(db_schedule)
     return db_schedule
 
 
 @staff_router.post("/department", response_model=schemas.DepartmentRequest)
-async def create_new_department(Name: str, db: Session = Depends(get_db)):
-    available_department = db.query(models.Department).filter(func.lower(models.Department.name) == func.lower(Name)).first()
-    if available_department:
-        raise HTTPException(status_code=400, detail="This department already exists")
+async def create_new_department(Name: str, db: AsyncSession = Depends(get_async_db)):
     db_department = models.Department(name = Name)
     if Name:
-        db.add(db_department)
-        db.commit()
-        db.refresh(db_department)
+        await add_unique(db, db_department, "This department already exists")
+        await db.flush()
+        await db.refresh(db_department)
         return db_department
     else:
         raise HTTPException(status_code=400, detail="Invalid input")
 
 @staff_router.post("/role", response_model=schemas.RoleRequest)
-async def create_new_role(Name: str, db: Session = Depends(get_db)):
-    available_role = db.query(models.Role).filter(func.lower(models.Role.name) == func.lower(Name)).first()
-    if available_role:
-        raise HTTPException(status_code=400, detail="This role already exists")
+async def create_new_role(Name: str, db: AsyncSession = Depends(get_async_db)):
     staff_id = None
     db_role = models.Role(name = Name)
     if Name:
-        db.add(db_role)
-        db.commit()
-        db.refresh(db_role)
+        await add_unique(db, db_role, "This role already exists")
+        await db.flush()
+        await db.refresh(db_role)
         return db_role
     else:
         raise HTTPException(status_code=400, detail="Invalid input")
@@ -412,19 +790,20 @@ async def create_new_role(Name: str, db: Session = Depends(get_db)):
 @staff_router.post("/daily-activities", response_model=schemas.DailyActivityResponse)
 async def add_daily_activity(
     activity_data: schemas.DailyActivityRequest,
-    current_user_role: str = Depends(get_current_user_role)
+    current_user_role: str = Depends(get_current_user_role),
+    db: AsyncSession = Depends(get_async_db)
 ):
     if current_user_role != "teacher":
         raise HTTPException(status_code=403, detail="Only teachers can add daily activities.")
 
-    student = session.query(Student).filter(Student.id == activity_data.student_id).first()
+    student = await db.scalar(select(Student).filter(Student.id == activity_data.student_id))
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
 
     new_activity = DailyActivity(**activity_data.dict())
-    session.add(new_activity)
-    session.commit()
-    session.refresh(new_activity)
+    db.add(new_activity)
+    await db.flush()
+    await db.refresh(new_activity)
 
     return new_activity
 
@@ -433,19 +812,20 @@ async def add_daily_activity(
 @staff_router.post("/billing", response_model=schemas.BillingResponse)
 async def create_bill(
     student_id: int, amount: float, due_date: datetime,
-    current_user_role: str = Depends(get_current_user_role)
+    current_user_role: str = Depends(get_current_user_role),
+    db: AsyncSession = Depends(get_async_db)
 ):
     if current_user_role != "accountant":
         raise HTTPException(status_code=403, detail="Only accountants can create bills.")
 
-    student = session.query(Student).filter(Student.id == student_id).first()
+    student = await db.scalar(select(Student).filter(Student.id == student_id))
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
 
     new_bill = Billing(student_id=student_id, amount=amount, due_date=due_date)
-    session.add(new_bill)
-    session.commit()
-    session.refresh(new_bill)
+    db.add(new_bill)
+    await db.flush()
+    await db.refresh(new_bill)
 
     return new_bill
 
@@ -454,12 +834,13 @@ async def create_bill(
 @staff_router.post("/payment", response_model=schemas.PaymentResponse)
 async def record_payment(
     bill_id: int, amount_paid: float, payment_method: str,
-    current_user_role: str = Depends(get_current_user_role)
+    current_user_role: str = Depends(get_current_user_role),
+    db: AsyncSession = Depends(get_async_db)
 ):
     if current_user_role != "accountant":
         raise HTTPException(status_code=403, detail="Only accountants can record payments.")
 
-    bill = session.query(Billing).filter(Billing.id == bill_id).first()
+    bill = await db.scalar(select(Billing).filter(Billing.id == bill_id))
     if not bill:
         raise HTTPException(status_code=404, detail="Bill not found")
 
@@ -467,17 +848,15 @@ async def record_payment(
         raise HTTPException(status_code=400, detail="Amount paid exceeds the billed amount")
 
     new_payment = Payment(bill_id=bill_id, amount_paid=amount_paid, payment_method=payment_method)
-    session.add(new_payment)
-    session.commit()
-    session.refresh(new_payment)
+    db.add(new_payment)
 
     if amount_paid == bill.amount:
         bill.status = "paid"
     elif amount_paid < bill.amount:
         bill.status = "partial"
 
-    session.commit()
-    session.refresh(bill)
+    await db.flush()
+    await db.refresh(new_payment)
 
     return new_payment
 
@@ -489,9 +868,9 @@ async def record_payment(
 async def edit_program(
     name: str = Form(None),
     description: str = Form(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    program_check = db.query(Program).filter(Program.name == name).first()
+    program_check = await db.scalar(select(Program).filter(Program.name == name))
     if not program_check:
         raise HTTPException(status_code=404, detail=f"Program does not exist")
 
@@ -501,8 +880,8 @@ async def edit_program(
     if description is not None:
         program_check.description = description
 
-    db.commit()
-    db.refresh(program_check)
+    await db.flush()
+    await db.refresh(program_check)
 
     return program_check
 
@@ -518,9 +897,9 @@ async def edit_staff(
     role: str = Form,
     image: str = Form,
     current_user: schemas.StaffResponse = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    staff_check = db.query(Staff).filter(Staff.email == email).first()
+    staff_check = await db.scalar(select(Staff).filter(Staff.email == email))
     if not staff_check:
         raise HTTPException(status_code=404, detail=f"Staff does not exist")
 
@@ -545,8 +924,8 @@ async def edit_staff(
     if image is not None:
         staff_check.image = image
 
-    db.commit()
-    db.refresh(staff_check)
+    await db.flush()
+    await db.refresh(staff_check)
 
     return staff_check
 
@@ -554,43 +933,43 @@ async def edit_staff(
 
 #      --   D E L E T E   R E Q U E S T S   --
 
-def delete_entity_by_id(entity_type, entity_id, current_user, db):
+async def delete_entity_by_id(entity_type, entity_id, current_user, db):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail=f"You do not have the permission to delete {entity_type}")
 
-    current_entity = db.query(entity_type).filter(entity_type.id == entity_id).first()
+    current_entity = await db.scalar(select(entity_type).filter(entity_type.id == entity_id))
     if not current_entity:
         raise HTTPException(status_code=404, detail=f"{entity_type} with ID {entity_id} not available")
 
-    db.delete(current_entity)
-    db.commit()
+    await db.delete(current_entity)
+    await db.flush()
 
     return current_entity
 
 @staff_router.delete("/staff/id", response_model=schemas.StaffRequest)
-async def delete_staff(staff_id: int, current_user: schemas.StaffResponse = Depends(get_current_user), db: Session = Depends(get_db)):
-    return delete_entity_by_id(models.Staff, staff_id, current_user, db)
+async def delete_staff(staff_id: int, current_user: schemas.StaffResponse = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    return await delete_entity_by_id(models.Staff, staff_id, current_user, db)
 
 @staff_router.delete("/program/id", response_model=schemas.ProgramRequest)
-async def delete_program(program_id: int, current_user: schemas.StaffResponse = Depends(get_current_user), db: Session = Depends(get_db)):
-    return delete_entity_by_id(models.Program, program_id, current_user, db)
+async def delete_program(program_id: int, current_user: schemas.StaffResponse = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    return await delete_entity_by_id(models.Program, program_id, current_user, db)
 
 @staff_router.delete("/class/id", response_model=schemas.ClassRequest)
-async def delete_class(class_id: int, current_user: schemas.StaffResponse = Depends(get_current_user), db: Session = Depends(get_db)):
-    return delete_entity_by_id(models.Class, class_id, current_user, db)
+async def delete_class(class_id: int, current_user: schemas.StaffResponse = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    return await delete_entity_by_id(models.Class, class_id, current_user, db)
 
 @staff_router.delete("/student/id", response_model=schemas.StudentRequest)
-async def delete_student(student_id: int, current_user: schemas.StaffResponse = Depends(get_current_user), db: Session = Depends(get_db)):
-    return delete_entity_by_id(models.Student, student_id, current_user, db)
+async def delete_student(student_id: int, current_user: schemas.StaffResponse = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    return await delete_entity_by_id(models.Student, student_id, current_user, db)
 
 @staff_router.delete("/daily-activities/{activity_id}", response_model=schemas.DailyActivityResponse)
-async def delete_daily_activity(activity_id: int):
-    activity = session.query(DailyActivity).filter(DailyActivity.id == activity_id).first()
+async def delete_daily_activity(activity_id: int, db: AsyncSession = Depends(get_async_db)):
+    activity = await db.scalar(select(DailyActivity).filter(DailyActivity.id == activity_id))
     if not activity:
         raise HTTPException(status_code=404, detail="Daily activity not found")
 
-    session.delete(activity)
-    session.commit()
+    await db.delete(activity)
+    await db.flush()
 
     return activity
 
@@ -601,16 +980,16 @@ async def delete_daily_activity(activity_id: int):
 parent_router = APIRouter()
 
 #      --   G E T   R E Q U E S T S   --
-@starter.get("/parents", response_model=schemas.ParentResponse)
-async def get_parent_by_id(db: Session = Depends(get_db)):
-    parents = db.query(models.Parent).all()
+@preschool_router.get("/parents", response_model=schemas.Page[schemas.ParentResponse])
+async def get_parents(page: PageParams = Depends(), db: AsyncSession = Depends(get_async_db)):
+    parents = (await db.scalars(paginate(select(models.Parent), models.Parent.id, page))).all()
     if not parents:
         raise HTTPException(status_code=404, detail="Parents not found")
-    return parents
+    return make_page(parents, page)
 
-@starter.get("/parents/{parent_id}", response_model=schemas.ParentResponse)
-async def get_parent_by_id(parent_id: int, db: Session = Depends(get_db)):
-    parent = db.query(models.Parent).filter(models.Parent.id == parent_id).first()
+@preschool_router.get("/parents/{parent_id}", response_model=schemas.ParentResponse)
+async def get_parent_by_id(parent_id: int, db: AsyncSession = Depends(get_async_db)):
+    parent = await db.scalar(select(models.Parent).filter(models.Parent.id == parent_id))
     if not parent:
         raise HTTPException(status_code=404, detail="Parent not found")
     return parent
@@ -620,25 +999,25 @@ async def get_parent_by_id(parent_id: int, db: Session = Depends(get_db)):
 #      --   P O S T   R E Q U E S T S   --
 
 @parent_router.post("/parent/register", response_model=schemas.ParentCreate)
-async def register_parent(parent_data: schemas.ParentCreate, db: Session = Depends(get_db)):
-    existing_parent = db.query(models.Parent).filter(models.Parent.email == parent_data.email).first()
+async def register_parent(parent_data: schemas.ParentCreate, db: AsyncSession = Depends(get_async_db)):
+    existing_parent = await db.scalar(select(models.Parent).filter(models.Parent.email == parent_data.email))
     if existing_parent:
         raise HTTPException(status_code=400, detail="Parent with this email already registered")
 
     new_parent = models.Parent(**parent_data.dict())
     db.add(new_parent)
-    db.commit()
-    db.refresh(new_parent)
+    await db.flush()
+    await db.refresh(new_parent)
 
     return new_parent
 
 @parent_router.post("/parent/login", response_model=schemas.Token)
-async def parent_login(parent_login: schemas.ParentLogin, db: Session = Depends(get_db)):
-    parent = db.query(models.Parent).filter(models.Parent.email == parent_data.email).first()
+async def parent_login(request: Request, parent_data: schemas.ParentLogin, db: AsyncSession = Depends(get_async_db)):
+    parent = await db.scalar(select(models.Parent).filter(models.Parent.email == parent_data.email))
     if not parent or not parent.verify_password(parent_data.password):
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
-    access_token = create_access_token({"sub": parent.email, "role": "parent"})
+    access_token = create_access_token({"sub": parent.email, "role": "parent"}, request.app.state.settings.SECRET_KEY)
 
     return {"access_token": access_token, "token_type": "bearer"}
 
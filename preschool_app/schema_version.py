@@ -0,0 +1,35 @@
+from pathlib import Path
+from alembic.script import ScriptDirectory
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+MIGRATIONS = Path(__file__).resolve().parent.parent / "migrations"
+
+
+class SchemaVersionError(RuntimeError):
+    pass
+
+
+def expected_revisions():
+    # Reads the revision files only; no database access.
+    return set(ScriptDirectory(str(MIGRATIONS)).get_heads())
+
+
+async def check_schema_version(engine):
+    # One SELECT against alembic_version. The app never runs DDL itself:
+    # `alembic upgrade head` is a separate deploy step, run once before the
+    # workers start.
+    try:
+        async with engine.connect() as connection:
+            current = set((await connection.scalars(text("SELECT version_num FROM alembic_version"))).all())
+    except DBAPIError as error:
+        raise SchemaVersionError(
+            "Could not read alembic_version; if the database is reachable, run `alembic upgrade head` "
+            "(or `alembic stamp 0001` first for a database built before migrations)"
+        ) from error
+    expected = expected_revisions()
+    if current != expected:
+        raise SchemaVersionError(
+            f"Database schema is at {sorted(current) or 'no revision'}, expected {sorted(expected)}; "
+            "run `alembic upgrade head`"
+        )
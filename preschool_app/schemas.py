@@ -1,6 +1,20 @@
-from datetime import datetime
-from pydantic import BaseModel
-from typing import List, Optional, Dict, Union
+from datetime import date, datetime
+from pydantic import BaseModel, ConfigDict, Field, create_model
+from typing import Generic, List, Literal, Optional, Dict, TypeVar, Union
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+
+def sparse(schema):
+    # Same fields as schema, all optional, for responses built from a
+    # ?fields= selection; pair with response_model_exclude_unset=True.
+    fields = {name: (Optional[field.annotation], None) for name, field in schema.model_fields.items()}
+    return create_model(f"Sparse{schema.__name__}", __config__=ConfigDict(from_attributes=True), **fields)
 
 
 class Token(BaseModel):
@@ -25,6 +39,9 @@ class ClassResponse(BaseModel):
     id: int
     name: str
     program: List[str]
+    class_teacher: Optional[str] = None
+    assistant_teacher: Optional[str] = None
+    student_count: int = 0
 
 
 class StudentRequest(BaseModel):
@@ -110,6 +127,7 @@ class RoleResponse(BaseModel):
     id: int
     name: str
     staff: List[Dict[str, Union[int, str]]]
+    staff_total: int = 0
 
 class GenderRequest(BaseModel):
     name: str
@@ -124,6 +142,7 @@ class AttendanceBase(BaseModel):
 
 class AttendanceCreate(AttendanceBase):
     student_id: int
+    status: Literal["present", "absent"]
 
 class AttendanceResponse(AttendanceBase):
     id: int
@@ -193,6 +212,7 @@ class StudentBase(BaseModel):
 
 class StudentResponse(StudentBase):
     id: int
+    image: Optional[str] = None
     # ... other student fields
     medical_conditions: List[MedicalConditionResponse]
 
@@ -314,4 +334,125 @@ class ParentCreate(BaseModel):
 
 class ParentLogin(BaseModel):
     email: str
-    password: str
\ No newline at end of file
+    password: str
+
+class PoolStatus(BaseModel):
+    pool: str
+    status: str
+    size: Optional[int] = None
+    max_overflow: Optional[int] = None
+    checked_in: Optional[int] = None
+    checked_out: Optional[int] = None
+    overflow: Optional[int] = None
+    checkouts: Optional[int] = None
+    timeouts: Optional[int] = None
+    avg_wait_ms: Optional[float] = None
+    max_wait_ms: Optional[float] = None
+
+class PoolMetricsResponse(BaseModel):
+    engines: Dict[str, PoolStatus]
+
+SparseStudentResponse = sparse(StudentResponse)
+SparseStaffResponse = sparse(StaffResponse)
+
+class StudentSearchPage(Page[SparseStudentResponse]):
+    total: int
+
+class SearchHit(BaseModel):
+    kind: str
+    id: int
+    name: str
+    score: float
+
+class AutocompleteHit(BaseModel):
+    kind: str
+    id: int
+    name: str
+
+class NameIndexStatus(BaseModel):
+    entries: int
+    truncated: bool
+
+class RollCallEntry(BaseModel):
+    student_id: int
+    status: Literal["present", "absent"]
+
+class RollCallRequest(BaseModel):
+    date: date
+    entries: List[RollCallEntry] = Field(..., min_length=1, max_length=200)
+
+class RollCallResult(BaseModel):
+    student_id: int
+    status: str
+    result: str  # "created", "updated" or "not_in_class"
+
+class RollCallResponse(BaseModel):
+    class_id: int
+    date: date
+    results: List[RollCallResult]
+
+class AttendanceRollup(BaseModel):
+    present: int
+    absent: int
+    rate: Optional[float] = None  # present / marked, None before any marks
+
+class StudentAttendanceMonthResponse(AttendanceRollup):
+    student_id: int
+    month: date
+
+class ClassAttendanceDayResponse(AttendanceRollup):
+    attendance_day: date
+
+class ClassAttendanceMonthResponse(AttendanceRollup):
+    class_id: int
+    month: date
+    days: List[ClassAttendanceDayResponse]
+    students: List[StudentAttendanceMonthResponse]
+
+class EnrollmentCountResponse(BaseModel):
+    id: int
+    name: Optional[str] = None
+    students: int
+
+class EnrollmentStats(BaseModel):
+    total: int
+    classes: List[EnrollmentCountResponse]
+    programs: List[EnrollmentCountResponse]
+
+class PerfectAttendance(BaseModel):
+    month: date
+    school_days: int
+    students: List[int]
+
+class AbsenceStreak(BaseModel):
+    student_id: int
+    longest_absence: int  # consecutive school days
+
+class ChronicAbsence(BaseModel):
+    student_id: int
+    absent: int
+    marked: int
+    rate: float
+
+class CoPresence(BaseModel):
+    student_id: int
+    days_together: int
+
+class RoomEventRequest(BaseModel):
+    # Exactly one of the two.
+    student_id: Optional[int] = None
+    staff_id: Optional[int] = None
+
+class RoomEventResponse(BaseModel):
+    id: int
+    class_id: int
+    student_id: Optional[int] = None
+    staff_id: Optional[int] = None
+    event: str  # "in" or "out"
+    at: datetime
+
+class RoomOccupancy(BaseModel):
+    class_id: int
+    children: int
+    staff: int
+    children_per_staff: Optional[float] = None  # None while no staff are in the room
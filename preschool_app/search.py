@@ -0,0 +1,44 @@
+import re
+from sqlalchemy import text
+
+# Hit type -> table with a `name` column that gets a full-text index.
+SEARCHABLE = {
+    "student": "student",
+    "parent": "parent",
+    "staff": "staff",
+}
+
+MAX_TERMS = 8
+TERM = re.compile(r"\w+", re.UNICODE)
+
+
+def search_terms(q):
+    return TERM.findall(q.lower())[:MAX_TERMS]
+
+
+def search_query(dialect, terms, kinds, limit):
+    # Every term must match as a word prefix, so "ade ola" finds "Adebayo Olamide".
+    if dialect == "sqlite":
+        match = " ".join(f'"{term}"*' for term in terms)
+        parts = [
+            f"SELECT '{kind}' AS kind, {table}.id AS id, {table}.name AS name, -bm25({table}_fts) AS score "
+            f"FROM {table}_fts JOIN {table} ON {table}.id = {table}_fts.rowid "
+            f"WHERE {table}_fts MATCH :match"
+            for kind, table in SEARCHABLE.items() if kind in kinds
+        ]
+    elif dialect == "mysql":
+        match = " ".join(f"+{term}*" for term in terms)
+        parts = [
+            f"SELECT '{kind}' AS kind, id, name, MATCH (name) AGAINST (:match IN BOOLEAN MODE) AS score "
+            f"FROM {table} WHERE MATCH (name) AGAINST (:match IN BOOLEAN MODE)"
+            for kind, table in SEARCHABLE.items() if kind in kinds
+        ]
+    else:
+        # No full-text index on other backends: unranked prefix match on the first term.
+        match = f"{terms[0]}%"
+        parts = [
+            f"SELECT '{kind}' AS kind, id, name, 0 AS score FROM {table} WHERE lower(name) LIKE :match"
+            for kind, table in SEARCHABLE.items() if kind in kinds
+        ]
+    sql = " UNION ALL ".join(parts) + " ORDER BY score DESC, kind, id LIMIT :limit"
+    return text(sql).bindparams(match=match, limit=limit)
@@ -0,0 +1,74 @@
+from preschool_app.autocomplete import NameIndex
+
+
+def names(hits):
+    return [hit["name"] for hit in hits]
+
+
+def test_lookup_matches_the_start_of_any_word():
+    index = NameIndex(100)
+    index.add("student", 1, "Adebayo Olamide")
+    index.add("parent", 2, "Olamide Adeyemi")
+    index.add("staff", 3, "Zainab Okafor")
+
+    assert names(index.lookup("olam")) == ["Adebayo Olamide", "Olamide Adeyemi"]
+    assert names(index.lookup("ade")) == ["Adebayo Olamide", "Olamide Adeyemi"]
+    assert names(index.lookup("olamide ade")) == ["Olamide Adeyemi"]
+    assert names(index.lookup("lamide")) == []
+
+
+def test_lookup_ignores_case_accents_and_spacing():
+    index = NameIndex(100)
+    index.add("student", 1, "Chloé  Müller")
+
+    assert names(index.lookup("  CHLOE mu")) == ["Chloé  Müller"]
+
+
+def test_lookup_filters_kinds_and_limits_hits():
+    index = NameIndex(100)
+    for ref_id in range(5):
+        index.add("student", ref_id, f"Ada {ref_id}")
+    index.add("staff", 9, "Ada Staff")
+
+    assert len(index.lookup("ada", limit=3)) == 3
+    assert names(index.lookup("ada", kinds={"staff"})) == ["Ada Staff"]
+    assert index.lookup("") == []
+
+
+def test_rename_and_remove_drop_old_keys():
+    index = NameIndex(100)
+    index.add("student", 1, "Old Name")
+    index.add("student", 1, "New Name")
+
+    assert index.lookup("old") == []
+    assert names(index.lookup("name")) == ["New Name"]
+
+    index.remove("student", 1)
+
+    assert len(index) == 0
+
+
+def test_entries_past_the_limit_are_dropped():
+    index = NameIndex(3)
+    index.add("student", 1, "Ada Lovelace")
+    index.add("student", 2, "Grace Brewster Hopper")
+
+    assert index.truncated
+    assert index.lookup("grace") == []
+
+
+def test_replace_replays_changes_made_during_the_rebuild():
+    index = NameIndex(100)
+    index.add("student", 1, "Old Name")
+    index.start_rebuild()
+    # Committed while the rebuild's SELECTs ran; the rows below predate them.
+    index.add("student", 2, "Zainab Okafor")
+    index.remove("student", 1)
+    index.add("student", 3, "Ada Lovelace")
+
+    index.replace([("student", 1, "Old Name"), ("student", 3, "Ada Lovelace")])
+
+    assert names(index.lookup("okaf")) == ["Zainab Okafor"]
+    assert index.lookup("old") == []
+    assert names(index.lookup("ada")) == ["Ada Lovelace"]
+    assert index.replay is None
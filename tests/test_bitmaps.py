@@ -0,0 +1,50 @@
+from datetime import date
+
+from sqlalchemy import create_engine, select
+
+from preschool_app.bitmaps import (
+    absence_streaks, bitmap_row, chronic_absence, compress, longest_run, perfect_attendance, upsert_bitmaps,
+)
+from preschool_app.models import AttendanceBitmap
+
+MONTH = date(2026, 10, 1)
+
+
+def days(*numbers):
+    return sum(1 << (number - 1) for number in numbers)
+
+
+def test_compress_skips_days_nobody_was_marked():
+    # Absent Friday the 2nd and Monday the 5th: one run once the weekend is packed out.
+    school = days(1, 2, 5, 6)
+
+    assert compress(days(2, 5), school) == 0b0110
+    assert longest_run(compress(days(2, 5), school)) == 2
+
+
+def test_reports_from_bitmaps():
+    bitmaps = [
+        (1, days(1, 2, 5, 6), 0),
+        (2, days(1), days(2, 5, 6)),
+        (3, days(1, 2, 6), days(5)),
+    ]
+
+    assert perfect_attendance(bitmaps) == (4, [1])
+    assert absence_streaks(bitmaps, 2) == [{"student_id": 2, "longest_absence": 3}]
+    assert [hit["student_id"] for hit in chronic_absence(bitmaps, 0.25)] == [2, 3]
+
+
+def test_upsert_moves_the_day_between_columns():
+    engine = create_engine("sqlite://")
+    AttendanceBitmap.__table__.create(engine)
+
+    def mark(day, status):
+        with engine.begin() as connection:
+            connection.execute(upsert_bitmaps("sqlite", day, [bitmap_row(1, MONTH, day, status)]))
+        with engine.connect() as connection:
+            return connection.execute(select(AttendanceBitmap.present_days, AttendanceBitmap.absent_days)).one()
+
+    assert mark(date(2026, 10, 1), "present") == (days(1), 0)
+    assert mark(date(2026, 10, 2), "absent") == (days(1), days(2))
+    assert mark(date(2026, 10, 1), "absent") == (0, days(1, 2))
+    assert mark(date(2026, 10, 2), "late") == (0, days(1))
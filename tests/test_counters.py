@@ -0,0 +1,48 @@
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from preschool_app.counters import SCHOOL
+from preschool_app.models import Base, Class, EnrollmentCount, Program, Student
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    # Like the app's sessions, so a student's class_id is still loaded when it changes.
+    with Session(engine, expire_on_commit=False) as db:
+        program = Program(name="Program", description="")
+        db.add(program)
+        db.flush()
+        db.add_all([Class(name="Red", program_id=program.id), Class(name="Blue", program_id=program.id)])
+        db.commit()
+        yield db
+
+
+def counts(db):
+    rows = db.execute(select(EnrollmentCount.scope, EnrollmentCount.scope_id, EnrollmentCount.students))
+    return {(scope, scope_id): students for scope, scope_id, students in rows}
+
+
+def test_counts_follow_inserts_moves_and_deletes(db):
+    students = [Student(name=f"Student {seat}", age=4, class_id=1) for seat in range(3)]
+    db.add_all(students)
+    db.add(Student(name="Unassigned", age=4))
+    db.commit()
+
+    assert counts(db) == {SCHOOL: 4, ("class", 1): 3}
+
+    students[0].class_id = 2
+    db.delete(students[1])
+    db.commit()
+
+    assert counts(db) == {SCHOOL: 3, ("class", 1): 1, ("class", 2): 1}
+
+
+def test_rolled_back_changes_are_not_counted(db):
+    db.add(Student(name="Ada", age=4, class_id=1))
+    db.flush()
+    db.rollback()
+
+    assert counts(db) == {}
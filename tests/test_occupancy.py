@@ -0,0 +1,46 @@
+from preschool_app.occupancy import Occupancy
+
+
+def test_check_in_moves_a_person_between_rooms():
+    occupancy = Occupancy()
+    occupancy.apply("in", "children", 1, 10)
+    occupancy.apply("in", "staff", 7, 10)
+    occupancy.apply("in", "children", 2, 10)
+    occupancy.apply("in", "children", 1, 20)
+
+    assert occupancy.room(10) == {"class_id": 10, "children": 1, "staff": 1, "children_per_staff": 1.0}
+    assert occupancy.room(20)["children"] == 1
+
+
+def test_check_out_empties_the_room():
+    occupancy = Occupancy()
+    occupancy.apply("in", "children", 1, 10)
+    occupancy.apply("out", "children", 1, 10)
+    occupancy.apply("out", "children", 2, 10)
+
+    assert occupancy.occupied() == []
+    assert occupancy.room(10)["children_per_staff"] is None
+
+
+def test_replace_replays_events_applied_during_the_rebuild():
+    occupancy = Occupancy()
+    occupancy.start_rebuild()
+    # Committed while the rebuild's SELECT ran, which saw neither.
+    occupancy.apply("in", "children", 3, 20)
+    occupancy.apply("out", "staff", 7, 10)
+
+    occupancy.replace([("in", 1, None, 10), ("in", None, 7, 10)])
+
+    assert [room["class_id"] for room in occupancy.occupied()] == [10, 20]
+    assert occupancy.room(10)["staff"] == 0
+    assert occupancy.room(20)["children"] == 1
+    assert occupancy.replay is None
+
+
+def test_replace_without_rebuild_replays_nothing():
+    occupancy = Occupancy()
+    occupancy.apply("in", "children", 3, 20)
+
+    occupancy.replace([("in", 1, None, 10)])
+
+    assert occupancy.occupied() == [{"class_id": 10, "children": 1, "staff": 0, "children_per_staff": None}]
@@ -0,0 +1,52 @@
+import base64
+
+import pytest
+from fastapi import HTTPException
+
+from preschool_app.pagination import decode_cursor, encode_cursor, make_page
+
+
+class Page:
+    limit = 2
+
+
+class Item:
+    def __init__(self, id):
+        self.id = id
+
+
+def raw_cursor(text):
+    return base64.urlsafe_b64encode(text.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def test_cursor_round_trips():
+    cursor = encode_cursor([42, "2026-10-18"])
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == [42, "2026-10-18"]
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    raw_cursor("not json"),
+    raw_cursor('{"id": 1}'),
+    raw_cursor("[]"),
+    raw_cursor('["1"]'),
+    raw_cursor("[1.5]"),
+    raw_cursor("[true]"),
+    raw_cursor("[null]"),
+])
+def test_cursor_without_integer_key_is_rejected(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor)
+
+    assert error.value.status_code == 400
+
+
+def test_make_page_sets_cursor_only_when_more_rows_follow():
+    full = make_page([Item(1), Item(2), Item(3)], Page())
+    last = make_page([Item(4), Item(5)], Page())
+
+    assert [item.id for item in full["items"]] == [1, 2]
+    assert decode_cursor(full["next_cursor"]) == [2]
+    assert last["next_cursor"] is None
@@ -0,0 +1,72 @@
+from pathlib import Path
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+from instance.config import Settings
+from preschool_app import create_app, models
+
+ROOT = Path(__file__).resolve().parent.parent
+CLASSES = 5
+
+
+def migrate(engine):
+    config = Config(str(ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(ROOT / "migrations"))
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        command.upgrade(config, "head")
+
+
+def seed(engine):
+    with Session(engine) as db:
+        for number in range(1, CLASSES + 1):
+            program = models.Program(name=f"Program {number}", description="")
+            teachers = [models.Teacher(staff=models.Staff(name=f"Teacher {number}{suffix}", email=f"t{number}{suffix}@example.com")) for suffix in "ab"]
+            db.add_all([program, *teachers])
+            db.flush()
+            room = models.Class(name=f"Class {number}", program_id=program.id, class_teacher_id=teachers[0].id, assistant_teacher_id=teachers[1].id)
+            db.add(room)
+            db.flush()
+            db.add_all(models.Student(name=f"Student {number}-{seat}", age=4, class_id=room.id) for seat in range(3))
+        db.commit()
+
+
+@pytest.fixture
+def client(tmp_path):
+    url = f"sqlite:///{tmp_path / 'test.db'}"
+    app = create_app(Settings(SECRET_KEY="test", DATABASE_URI=url))
+    engine = create_engine(url)
+    migrate(engine)
+    seed(engine)
+    engine.dispose()
+    with TestClient(app) as client:
+        client.statements = []
+        event.listen(
+            app.state.database.async_engine.sync_engine,
+            "before_cursor_execute",
+            lambda connection, cursor, statement, *args: client.statements.append(statement),
+        )
+        yield client
+
+
+def test_class_list_is_one_statement(client):
+    response = client.get("/classes")
+
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == CLASSES
+    assert response.json()["items"][0]["class_teacher"] == "Teacher 1a"
+    assert response.json()["items"][0]["student_count"] == 3
+    assert len(client.statements) == 1, client.statements
+
+
+def test_class_detail_is_one_statement(client):
+    response = client.get("/classes/class_id", params={"class_id": CLASSES})
+
+    assert response.status_code == 200
+    assert response.json()["assistant_teacher"] == f"Teacher {CLASSES}b"
+    assert len(client.statements) == 1, client.statements